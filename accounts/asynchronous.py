@@ -0,0 +1,129 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseNotAllowed
+from django.utils.cache import get_conditional_response
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .models import DataVersion
+from .conditional import validators, with_validators
+
+
+_executor = None
+
+
+def query_executor():
+    """
+    The long-lived threads async views run their queries on. Each keeps its
+    database connection between requests (CONN_MAX_AGE, or the pool on
+    Postgres), instead of the fresh per-request thread sync_to_async would
+    otherwise use connecting anew every time.
+    """
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_QUERY_THREADS, thread_name_prefix='async-queries'
+        )
+    return _executor
+
+
+def on_query_thread(func):
+    """
+    Awaitable running a blocking ORM callable on one of the query threads
+    """
+    def run():
+        try:
+            return func()
+        finally:
+            # Like request_finished does: drop the connection once it is
+            # too old or broken, otherwise keep it for the next call
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False, executor=query_executor())()
+
+
+async def concurrently(*funcs):
+    """
+    Run independent blocking ORM callables at the same time and return their
+    results in order. Django's async queryset methods all hop onto the
+    request's single sync thread, so they would still run one by one; each
+    callable goes to a query thread, with its connection, of its own instead.
+    """
+    return await asyncio.gather(*(on_query_thread(func) for func in funcs))
+
+
+def json_response(data, status=200, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type=JSONRenderer.media_type,
+        status=status,
+        headers=headers
+    )
+
+
+def authenticate(request):
+    """
+    Run the configured DRF authentication classes and return the user and
+    their DataVersion row, raising NotAuthenticated/AuthenticationFailed
+    like an APIView would
+    """
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    drf_request = Request(request, authenticators=authenticators)
+    try:
+        user = drf_request.user
+        if not user or not user.is_authenticated:
+            raise exceptions.NotAuthenticated()
+    except (exceptions.NotAuthenticated, exceptions.AuthenticationFailed) as error:
+        error.auth_header = authenticators[0].authenticate_header(drf_request) if authenticators else None
+        raise
+    return user, DataVersion.objects.get_or_create(user_id=user.pk)[0]
+
+
+def async_api_view(daily=False, validate=None):
+    """
+    Turn `async def view(request, user, *args, **kwargs) -> data` into an
+    authenticated async Django view returning the same JSON an APIView with
+    IsAuthenticated would. Conditional requests are answered with 304 from
+    the user's data version exactly like accounts.conditional.conditional(),
+    and the view receives that version as request.data_version. validate,
+    when given, parses the query parameters (request.GET) before that and
+    its result is passed on as request.validated; a ValueError becomes a
+    400 with its message.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return HttpResponseNotAllowed(['GET', 'HEAD'])
+
+            try:
+                # One trip to a query thread for both lookups
+                user, request.data_version = await on_query_thread(lambda: authenticate(request))
+            except exceptions.APIException as error:
+                headers = {'WWW-Authenticate': error.auth_header} if getattr(error, 'auth_header', None) else None
+                data = error.detail if isinstance(error.detail, (list, dict)) else {'detail': error.detail}
+                return json_response(data, error.status_code, headers)
+
+            if validate is not None:
+                try:
+                    request.validated = validate(request.GET)
+                except ValueError as error:
+                    return json_response({"error": str(error)}, status=400)
+
+            etag, last_modified = validators(
+                user.pk, request.data_version, JSONRenderer.media_type, daily, request.GET
+            )
+            etag = f'"{etag}"'
+            last_modified = int(last_modified.timestamp())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await func(request, user, *args, **kwargs)
+                if not isinstance(response, HttpResponse):
+                    response = json_response(response)
+            return with_validators(response, etag, last_modified)
+        return view
+    return decorator
@@ -0,0 +1,80 @@
+import time
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+# user id -> (expires at, field names, values) of recently loaded users, per worker
+_user_rows = {}
+MAX_CACHED_USERS = 10000
+DEFAULT_TTL = 30
+
+
+def claims_user(user_id):
+    """
+    An active User with only its primary key and active flag loaded. It can
+    be used to filter and assign foreign keys without another query; any
+    other field is loaded from the database the first time it is read.
+    """
+    return User.from_db(User.objects.db, [User._meta.pk.attname, 'is_active'], [user_id, True])
+
+
+def full_user(user):
+    """
+    The user with every field loaded, for the few views that show them
+    """
+    if user.get_deferred_fields():
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication without loading the user row on every request. The
+    row is loaded and checked like JWTAuthentication does (a deleted or
+    deactivated account gets a 401), then kept per worker process for
+    JWT_USER_CACHE_TTL seconds, so requests within that window need no
+    authentication query at all.
+
+    With JWT_USER_CACHE_TTL set to 0 nothing is cached; each request reads
+    only the active flag, through the primary key, and the user is built
+    from the token's user_id claim.
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        ttl = getattr(settings, 'JWT_USER_CACHE_TTL', DEFAULT_TTL)
+        if not ttl:
+            is_active = User.objects.filter(pk=user_id).values_list('is_active', flat=True).first()
+            if is_active is None:
+                raise AuthenticationFailed(_('User not found'), code='user_not_found')
+            if not is_active:
+                raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+            return claims_user(user_id)
+
+        now = time.monotonic()
+        cached = _user_rows.get(user_id)
+        if cached is not None and cached[0] > now:
+            # A fresh instance each time, requests must not share one
+            return User.from_db(User.objects.db, cached[1], cached[2])
+
+        user = super().get_user(validated_token)
+        if len(_user_rows) >= MAX_CACHED_USERS:
+            _user_rows.clear()
+        names = [field.attname for field in User._meta.concrete_fields]
+        _user_rows[user_id] = (now + ttl, names, [getattr(user, name) for name in names])
+        return user
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    # Only reaches this worker's cache, other workers wait for the TTL
+    _user_rows.pop(instance.pk, None)
@@ -0,0 +1,145 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+from .models import DataVersion
+
+CACHE_ALIAS = getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')
+CACHE_TIMEOUT = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+HITS_KEY = 'response-cache:hits'
+MISSES_KEY = 'response-cache:misses'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_version(user_id):
+    """
+    Current data version of a user. The row is created on first read so that
+    every later write has a row to bump.
+    """
+    version = DataVersion.objects.filter(user_id=user_id).values_list('version', flat=True).first()
+    if version is None:
+        version = DataVersion.objects.get_or_create(user_id=user_id)[0].version
+    return version
+
+
+async def aget_version(user_id):
+    version = await DataVersion.objects.filter(user_id=user_id).values_list('version', flat=True).afirst()
+    if version is None:
+        version = (await DataVersion.objects.aget_or_create(user_id=user_id))[0].version
+    return version
+
+
+def bump_version(user_id):
+    """
+    Invalidate everything cached for a user. Only an existing row is bumped:
+    without one nothing can have been cached under the user's version yet.
+    """
+    DataVersion.objects.filter(user_id=user_id).update(
+        version=F('version') + 1,
+        updated_at=timezone.now()
+    )
+
+
+def next_versions(user_ids):
+    """
+    Bump the data version of each user and return user id -> new version,
+    creating missing rows first. Call it inside the database transaction
+    that makes the write and stamp the written rows with the result: the
+    bumped row stays locked until that transaction commits, so a user's
+    versions are handed out in commit order and a version that can be read
+    is never followed by a write still committing below it (see
+    transactions/sync.py).
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return {}
+    rows = DataVersion.objects.filter(user_id__in=user_ids)
+    now = timezone.now()
+    if rows.update(version=F('version') + 1, updated_at=now) < len(user_ids):
+        # First write of some of the users
+        existing = set(rows.values_list('user_id', flat=True))
+        missing = [user_id for user_id in user_ids if user_id not in existing]
+        DataVersion.objects.bulk_create([DataVersion(user_id=user_id) for user_id in missing], ignore_conflicts=True)
+        DataVersion.objects.filter(user_id__in=missing).update(version=F('version') + 1, updated_at=now)
+    return dict(rows.values_list('user_id', 'version'))
+
+
+def next_version(user_id):
+    return next_versions([user_id])[user_id]
+
+
+def count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+async def acount(key):
+    cache = get_cache()
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        if not await cache.aadd(key, 1, timeout=None):
+            await cache.aincr(key)
+
+
+def cache_key(user_id, version, name, params):
+    return 'response:{}:{}:{}:{}'.format(
+        user_id, version, name, ':'.join(str(param) for param in params)
+    )
+
+
+def cached(user, name, params, compute):
+    """
+    Return (data, hit) for a per-user response, computing and storing it
+    under the user's current data version on a miss
+    """
+    cache = get_cache()
+    key = cache_key(user.pk, get_version(user.pk), name, params)
+    data = cache.get(key)
+    if data is not None:
+        count(HITS_KEY)
+        return data, True
+
+    data = compute()
+    cache.set(key, data, CACHE_TIMEOUT)
+    count(MISSES_KEY)
+    return data, False
+
+
+async def acached(user, name, params, compute, version=None):
+    """
+    cached() for async views, where compute is a coroutine function. Pass
+    the data version when it has already been looked up.
+    """
+    cache = get_cache()
+    if version is None:
+        version = await aget_version(user.pk)
+    key = cache_key(user.pk, version, name, params)
+    data = await cache.aget(key)
+    if data is not None:
+        await acount(HITS_KEY)
+        return data, True
+
+    data = await compute()
+    await cache.aset(key, data, CACHE_TIMEOUT)
+    await acount(MISSES_KEY)
+    return data, False
+
+
+def stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    return {
+        'backend': settings.CACHES[CACHE_ALIAS]['BACKEND'],
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / (hits + misses) if hits + misses else 0
+    }
@@ -0,0 +1,82 @@
+import hashlib
+from functools import wraps
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+from .models import DataVersion
+
+
+def data_version(request):
+    """
+    The requesting user's DataVersion row, looked up once per request
+    """
+    if not hasattr(request, '_data_version'):
+        request._data_version = DataVersion.objects.get_or_create(user_id=request.user.pk)[0]
+    return request._data_version
+
+
+def validators(user_id, version, media_type, daily=False, query=None):
+    """
+    (etag, last_modified) of a response built from a user's data at the given
+    DataVersion row for the given query parameters
+    """
+    parts = [user_id, version.version, media_type]
+    if query:
+        parts.append(sorted(query.lists()))
+    last_modified = version.updated_at
+    if daily:
+        now = timezone.now()
+        parts.append(now.date())
+        last_modified = max(last_modified, now.replace(hour=0, minute=0, second=0, microsecond=0))
+    etag = hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest()
+    return etag, last_modified
+
+
+def with_validators(response, etag, last_modified):
+    """
+    Add ETag and Last-Modified to successful and 304 responses only; an
+    error must not hand out validators a later request could match
+    """
+    if 200 <= response.status_code < 300 or response.status_code == status.HTTP_304_NOT_MODIFIED:
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    return response
+
+
+def conditional(daily=False, validate=None):
+    """
+    Answer If-None-Match / If-Modified-Since with 304 Not Modified from the
+    user's data version, before the view runs any query of its own, and add
+    ETag and Last-Modified to successful responses. The ETag covers the
+    query string. Views whose output also depends on today's date
+    (dashboard, current month) pass daily=True so their validators change
+    at midnight as well.
+
+    Views taking query parameters pass validate(view, request), which runs
+    first so that a request the view would reject is never answered with
+    304. It returns what the view needs from the parameters, kept as
+    request.validated, and raises ValueError (a 400 with its message as
+    "error") or an APIException when they are invalid.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            if validate is not None:
+                try:
+                    request.validated = validate(self, request)
+                except ValueError as error:
+                    return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+            etag, last_modified = validators(
+                request.user.pk, data_version(request), request.accepted_media_type, daily, request.query_params
+            )
+            etag = quote_etag(etag)
+            last_modified = int(last_modified.timestamp())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(self, request, *args, **kwargs)
+            return with_validators(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import statistics
+import time
+from asgiref.sync import ThreadSensitiveContext
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.test import AsyncClient, Client, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from .benchmark_endpoints import percentile
+
+ENDPOINTS = {
+    'dashboard': '/api/transactions/dashboard/',
+}
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+class Command(BaseCommand):
+    help = (
+        'Compares the throughput of the WSGI (sync DRF views, one thread per in-flight request) '
+        'and ASGI (async views with concurrent queries) paths under concurrent load, in process'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='loaduser0', help='User to benchmark as (see generate_data)')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint and mode')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+        parser.add_argument('--only', nargs='*', help='Only run these endpoint names')
+        parser.add_argument('--no-cache', action='store_true', help='Disable the response cache so every request aggregates')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist, run generate_data first')
+
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+        logging.getLogger('finance_tracker.requests').setLevel(logging.ERROR)
+
+        selected = ENDPOINTS
+        if options['only']:
+            selected = {name: url for name, url in ENDPOINTS.items() if name in options['only']}
+
+        settings = {'CACHES': NO_CACHE} if options['no_cache'] else {}
+        for name, url in selected.items():
+            with override_settings(**settings):
+                wsgi = self.run_wsgi(url, headers, options['requests'], options['concurrency'])
+            with override_settings(ROOT_URLCONF='finance_tracker_project.asgi_urls', **settings):
+                asgi = asyncio.run(self.run_asgi(url, headers, options['requests'], options['concurrency']))
+
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.report('wsgi', wsgi)
+            self.report('asgi', asgi)
+            self.stdout.write(f'  asgi/wsgi throughput {asgi["throughput"] / wsgi["throughput"]:.2f}x')
+
+    def run_wsgi(self, url, headers, requests, concurrency):
+        def worker(count):
+            client = Client()
+            timings = []
+            for _ in range(count):
+                started = time.perf_counter()
+                response = client.get(url, headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                self.expect_ok(url, response)
+            return timings
+
+        Client().get(url, headers=headers)  # warm up
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(worker, self.split(requests, concurrency)))
+        return self.summarize(results, time.perf_counter() - started)
+
+    async def run_asgi(self, url, headers, requests, concurrency):
+        async def worker(count):
+            client = AsyncClient()
+            timings = []
+            for _ in range(count):
+                started = time.perf_counter()
+                # Like ASGIHandler, give each request its own sync thread
+                async with ThreadSensitiveContext():
+                    response = await client.get(url, headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+                self.expect_ok(url, response)
+            return timings
+
+        await AsyncClient().get(url, headers=headers)  # warm up
+        started = time.perf_counter()
+        results = await asyncio.gather(*(worker(count) for count in self.split(requests, concurrency)))
+        return self.summarize(results, time.perf_counter() - started)
+
+    def split(self, requests, concurrency):
+        return [requests // concurrency + (1 if n < requests % concurrency else 0) for n in range(concurrency)]
+
+    def expect_ok(self, url, response):
+        if response.status_code != 200:
+            raise CommandError(f'GET {url} returned {response.status_code}')
+
+    def summarize(self, results, elapsed):
+        timings = sorted(timing for result in results for timing in result)
+        return {
+            'throughput': len(timings) / elapsed,
+            'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'mean_ms': statistics.mean(timings),
+        }
+
+    def report(self, mode, result):
+        self.stdout.write(
+            f'  {mode}  {result["throughput"]:>8.1f} req/s  p50 {result["p50_ms"]:>8.2f} ms  '
+            f'p95 {result["p95_ms"]:>8.2f} ms  mean {result["mean_ms"]:>8.2f} ms'
+        )
@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import DatabaseError, close_old_connections, connection, connections
+from transactions import rollups
+from transactions.dashboard import build_dashboard
+from transactions.models import Category, Transaction
+from .benchmark_endpoints import percentile
+
+# Django's own SQLite defaults, for --compare. The journal mode is stored in
+# the database file, so WAL is switched off separately before that run.
+UNTUNED_SQLITE = {'OPTIONS': {}, 'CONN_MAX_AGE': 0}
+
+
+def run_worker(args):
+    """
+    One worker process: a mix of dashboard reads and transaction writes
+    until the deadline, with a request boundary after every operation
+    """
+    user_id, seconds, write_ratio, seed = args
+    random.seed(seed)
+    today = date.today()
+    user = User.objects.get(pk=user_id)
+    categories = list(Category.objects.filter(user=user).values_list('id', flat=True))
+    close_old_connections()
+
+    timings = {'read': [], 'write': []}
+    errors = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        kind = 'write' if random.random() < write_ratio else 'read'
+        started = time.perf_counter()
+        try:
+            if kind == 'write':
+                Transaction.objects.create(
+                    user=user,
+                    amount=Decimal(random.randint(100, 20000)) / 100,
+                    description='Benchmark write',
+                    category_id=random.choice(categories),
+                    transaction_type='expense',
+                    date=today - timedelta(days=random.randint(0, 60))
+                )
+            else:
+                build_dashboard(user, today)
+        except DatabaseError as error:
+            errors[str(error)] += 1
+        else:
+            timings[kind].append((time.perf_counter() - started) * 1000)
+        finally:
+            close_old_connections()
+    connections.close_all()
+    return timings, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs a concurrent read/write workload from several worker processes against a throwaway '
+        'database with the configured connection profile and reports throughput, latency and errors'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker processes, like gunicorn workers')
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Share of operations that write')
+        parser.add_argument('--transactions', type=int, default=5000, help='Transactions to seed')
+        parser.add_argument('--compare', action='store_true', help='On SQLite, also run with Django\'s untuned defaults')
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        sqlite = connection.vendor == 'sqlite'
+        temp_dir = None
+        if sqlite:
+            # The default in-memory test database can't be shared between processes
+            temp_dir = tempfile.TemporaryDirectory()
+            settings_dict['TEST']['NAME'] = os.path.join(temp_dir.name, 'benchmark.sqlite3')
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = self.seed(options['transactions'])
+            profiles = [('configured', {})]
+            if options['compare'] and sqlite:
+                profiles.insert(0, ('django defaults', UNTUNED_SQLITE))
+
+            self.stdout.write(
+                f'{connection.vendor}, {options["workers"]} workers, {options["seconds"]:g}s, '
+                f'{options["write_ratio"]:.0%} writes'
+            )
+            for name, overrides in profiles:
+                self.report(name, self.run(user, overrides, options))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            if temp_dir is not None:
+                temp_dir.cleanup()
+
+    def seed(self, transactions):
+        random.seed(0)
+        today = date.today()
+        user = User.objects.create_user(username='dbbench', password='dbbench')
+        categories = Category.objects.bulk_create(
+            Category(name=f'Category {i}', description='', user=user) for i in range(8)
+        )
+        Transaction.objects.bulk_create((
+            Transaction(
+                user=user,
+                amount=Decimal(random.randint(100, 50000)) / 100,
+                description=f'Seeded {n}',
+                category=random.choice(categories),
+                transaction_type=random.choice(['income', 'expense']),
+                date=today - timedelta(days=random.randint(0, 730))
+            ) for n in range(transactions)
+        ), batch_size=2000)
+        rollups.rebuild(user)
+        return user
+
+    def run(self, user, overrides, options):
+        saved = {key: connection.settings_dict[key] for key in overrides}
+        connections.close_all()
+        connection.settings_dict.update(overrides)
+        try:
+            # Set the journal mode while no worker is connected
+            if overrides and connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode=DELETE')
+            else:
+                connection.ensure_connection()
+            # Workers are forked and must open their own connections
+            connections.close_all()
+
+            context = multiprocessing.get_context('fork')
+            jobs = [(user.pk, options['seconds'], options['write_ratio'], n) for n in range(options['workers'])]
+            with context.Pool(options['workers']) as pool:
+                results = pool.map(run_worker, jobs)
+        finally:
+            connection.settings_dict.update(saved)
+
+        timings = {'read': [], 'write': []}
+        errors = Counter()
+        for worker_timings, worker_errors in results:
+            for kind in timings:
+                timings[kind].extend(worker_timings[kind])
+            errors.update(worker_errors)
+        return timings, errors, options['seconds']
+
+    def report(self, name, result):
+        timings, errors, seconds = result
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        for kind, values in timings.items():
+            if not values:
+                continue
+            values.sort()
+            self.stdout.write(
+                f'  {kind:<6} {len(values) / seconds:>8.1f} ops/s  p50 {percentile(values, 50):>8.2f} ms  '
+                f'p95 {percentile(values, 95):>8.2f} ms  mean {statistics.mean(values):>8.2f} ms'
+            )
+        failed = sum(errors.values())
+        style = self.style.ERROR if failed else self.style.SUCCESS
+        self.stdout.write(style(f'  {failed} failed operations'))
+        for message, count in errors.most_common():
+            self.stdout.write(f'    {count} x {message}')
@@ -0,0 +1,149 @@
+import json
+import logging
+import math
+import statistics
+import time
+import tracemalloc
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db import connection
+from rest_framework.test import APIClient
+from accounts.cache import bump_version
+from finance_tracker_project.instrumentation import QueryRecorder
+
+
+def endpoints():
+    today = date.today()
+    start = today.replace(year=today.year - 1)
+    return {
+        'dashboard': '/api/transactions/dashboard/',
+        'list': '/api/transactions/',
+        'list deep page': '/api/transactions/?page=50',
+        'list cursor': '/api/transactions/?cursor=&page_size=100',
+        'filter': f'/api/transactions/?transaction_type=expense&start_date={start}&min_amount=20',
+        'search': '/api/transactions/?search=coffee',
+        'budgets': '/api/budgets/',
+        'budgets current month': '/api/budgets/current_month/',
+        'budgets summary': '/api/budgets/summary/',
+        'categories': '/api/transactions/categories/',
+    }
+
+
+def percentile(values, percent):
+    # Nearest-rank percentile of an already sorted list
+    index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+    return values[index]
+
+class Command(BaseCommand):
+    help = 'Benchmarks the main API endpoints through the Django test client and compares against a JSON baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='loaduser0', help='User to benchmark as (see generate_data)')
+        parser.add_argument('--requests', type=int, default=30, help='Requests per endpoint')
+        parser.add_argument('--only', nargs='*', help='Only run these endpoint names')
+        parser.add_argument('--bust-cache', action='store_true', help='Invalidate cached responses before every request')
+        parser.add_argument('--baseline', help='JSON baseline to compare against')
+        parser.add_argument('--save', help='Write the results to this JSON file (e.g. a new baseline)')
+        parser.add_argument('--tolerance', type=float, default=20.0, help='Allowed p95 regression in percent')
+        parser.add_argument('--strict', action='store_true', help='Exit with an error when a regression is found')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist, run generate_data first')
+
+        client = APIClient()
+        client.force_authenticate(user)
+        # Keep the per-request instrumentation running but out of the report
+        logging.getLogger('finance_tracker.requests').setLevel(logging.ERROR)
+
+        selected = endpoints()
+        if options['only']:
+            selected = {name: url for name, url in selected.items() if name in options['only']}
+
+        results = {}
+        for name, url in selected.items():
+            results[name] = self.measure(client, user, url, options['requests'], options['bust_cache'])
+            self.report(name, results[name])
+
+        if options['save']:
+            with open(options['save'], 'w') as handle:
+                json.dump(results, handle, indent=2)
+            self.stdout.write(f'Saved results to {options["save"]}')
+
+        if options['baseline']:
+            regressions = self.compare(results, options['baseline'], options['tolerance'])
+            if regressions and options['strict']:
+                raise CommandError(f'{len(regressions)} endpoint(s) regressed: {", ".join(regressions)}')
+
+    def measure(self, client, user, url, requests, bust_cache):
+        def get():
+            # Invalidation happens before the request so it is not measured
+            if bust_cache:
+                bump_version(user.pk)
+            started = time.perf_counter()
+            response = client.get(url)
+            elapsed = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise CommandError(f'GET {url} returned {response.status_code}')
+            return elapsed
+
+        get()  # warm up
+        timings = sorted(get() for _ in range(requests))
+
+        # Query count and peak memory from separate runs so they do not skew the timings
+        queries = QueryRecorder(keep=0)
+        if bust_cache:
+            bump_version(user.pk)
+        with connection.execute_wrapper(queries):
+            client.get(url)
+        if bust_cache:
+            bump_version(user.pk)
+        tracemalloc.start()
+        try:
+            client.get(url)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'url': url,
+            'requests': requests,
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.mean(timings), 2),
+            'queries': queries.count,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:<24} p50 {result["p50_ms"]:>9.2f} ms  p95 {result["p95_ms"]:>9.2f} ms  '
+            f'{result["queries"]:>4} queries  {result["peak_memory_kb"]:>10.1f} KiB peak'
+        )
+
+    def compare(self, results, path, tolerance):
+        try:
+            with open(path) as handle:
+                baseline = json.load(handle)
+        except (OSError, ValueError) as error:
+            raise CommandError(f'Could not read baseline {path}: {error}')
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'Compared with {path}'))
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                self.stdout.write(f'{name:<24} no baseline')
+                continue
+
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+            message = f'{name:<24} p95 {change:+7.1f}%  queries {previous["queries"]} -> {result["queries"]}'
+            if change > tolerance or result['queries'] > previous['queries']:
+                regressions.append(name)
+                self.stdout.write(self.style.ERROR(message + '  REGRESSION'))
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
+        return regressions
@@ -0,0 +1,117 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Sum
+from transactions.models import Category, Transaction
+from budgets.models import Budget
+
+class Command(BaseCommand):
+    help = 'Compares query plans and timings of the main access paths with and without the composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20)
+        parser.add_argument('--transactions', type=int, default=200000, help='Total transactions to seed')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query, the median is reported')
+
+    def handle(self, *args, **options):
+        # Work on a throwaway test database so real data and schema are never touched
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = self.seed(options['users'], options['transactions'])
+            queries = self.queries(user)
+            indexes = [(Transaction, index) for index in Transaction._meta.indexes]
+            indexes += [(Budget, index) for index in Budget._meta.indexes]
+
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.remove_index(model, index)
+            before = self.measure(queries, options['repeat'])
+
+            with connection.schema_editor() as editor:
+                for model, index in indexes:
+                    editor.add_index(model, index)
+            after = self.measure(queries, options['repeat'])
+
+            for name in queries:
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(f'  before: {before[name][0]:.3f} ms')
+                self.stdout.write(f'    {before[name][1]}')
+                self.stdout.write(f'  after:  {after[name][0]:.3f} ms')
+                self.stdout.write(f'    {after[name][1]}')
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def seed(self, users, transactions):
+        random.seed(0)
+        today = date.today()
+        per_user = max(transactions // users, 1)
+        for n in range(users):
+            user = User.objects.create_user(username=f'bench{n}', password='bench')
+            categories = Category.objects.bulk_create(
+                Category(name=f'Category {i}', description='', user=user) for i in range(8)
+            )
+            Transaction.objects.bulk_create((
+                Transaction(
+                    user=user,
+                    amount=Decimal(random.randint(100, 100000)) / 100,
+                    description=f'Transaction {i}',
+                    category=random.choice(categories),
+                    transaction_type=random.choice(['income', 'expense', 'expense']),
+                    date=today - timedelta(days=random.randint(0, 3 * 365))
+                ) for i in range(per_user)
+            ), batch_size=1000)
+            Budget.objects.bulk_create(
+                Budget(user=user, category=category, amount=Decimal('500.00'),
+                       month=(today.month + offset) % 12 + 1, year=today.year)
+                for category in categories for offset in range(12)
+            )
+        return user
+
+    def queries(self, user):
+        today = date.today()
+        start = today - timedelta(days=90)
+        category = user.categories.first()
+        transactions = Transaction.objects.filter(user=user)
+        return {
+            'list first page': lambda: list(transactions.order_by('-date')[:10]),
+            'list deep page': lambda: list(transactions.order_by('-date')[5000:5010]),
+            'expenses by date range': lambda: transactions.filter(
+                transaction_type='expense', date__gte=start
+            ).aggregate(Sum('amount')),
+            'category by date range': lambda: transactions.filter(
+                category=category, date__gte=start
+            ).aggregate(Sum('amount')),
+            'budgets for a month': lambda: list(
+                Budget.objects.filter(user=user, year=today.year, month=today.month)
+            ),
+        }
+
+    def measure(self, queries, repeat):
+        results = {}
+        for name, run in queries.items():
+            run()  # warm up
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                run()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = (statistics.median(timings), self.plan(run))
+        return results
+
+    def plan(self, run):
+        # Capture the SQL of the last statement the query ran and explain it
+        with connection.cursor() as cursor:
+            connection.force_debug_cursor = True
+            try:
+                run()
+                sql = connection.queries[-1]['sql']
+            finally:
+                connection.force_debug_cursor = False
+            prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+            cursor.execute(prefix + sql)
+            return ' | '.join(str(row[-1]) for row in cursor.fetchall())
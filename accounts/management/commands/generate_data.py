@@ -0,0 +1,127 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from accounts.cache import bump_version
+from accounts.models import UserProfile
+from budgets.models import Budget
+from transactions import rollups
+from transactions.dashboard import add_months
+from transactions.models import Category, Transaction
+
+# name -> (transaction type, typical amount range, descriptions)
+CATEGORIES = {
+    'Salary': ('income', (2500, 6000), ['Monthly salary', 'Payroll deposit']),
+    'Freelance': ('income', (100, 1500), ['Client invoice', 'Consulting work', 'Design project']),
+    'Rent': ('expense', (800, 2200), ['Monthly rent']),
+    'Groceries': ('expense', (10, 180), ['Whole Foods', 'Trader Joes', 'Local market', 'Costco run']),
+    'Utilities': ('expense', (30, 250), ['Electricity bill', 'Water bill', 'Internet', 'Phone plan']),
+    'Dining': ('expense', (8, 120), ['Coffee shop', 'Pizza night', 'Sushi dinner', 'Lunch with team']),
+    'Transport': ('expense', (2, 90), ['Metro card', 'Uber ride', 'Fuel', 'Parking']),
+    'Entertainment': ('expense', (5, 150), ['Movie tickets', 'Concert', 'Streaming subscription']),
+    'Healthcare': ('expense', (15, 400), ['Pharmacy', 'Doctor visit', 'Dental checkup']),
+    'Shopping': ('expense', (10, 500), ['Amazon order', 'Clothing store', 'Electronics']),
+}
+# Rent and salary happen once a month, everything else is spread at random
+MONTHLY = {'Salary', 'Rent'}
+
+class Command(BaseCommand):
+    help = 'Generates synthetic users with categories, budgets and transactions for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--transactions', type=int, default=10000, help='Transactions per user')
+        parser.add_argument('--months', type=int, default=24, help='How far back transactions go')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='loaduser', help='Username prefix')
+        parser.add_argument('--password', default='loadpassword123')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        password = make_password(options['password'])
+        usernames = [f"{options['prefix']}{n}" for n in range(options['users'])]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        if existing:
+            self.stdout.write(self.style.WARNING(f'Skipping {len(existing)} existing users'))
+
+        users = User.objects.bulk_create(
+            User(username=username, email=f'{username}@example.com', password=password)
+            for username in usernames if username not in existing
+        )
+        UserProfile.objects.bulk_create(UserProfile(user=user) for user in users)
+
+        today = date.today()
+        for user in users:
+            categories = Category.objects.bulk_create(
+                Category(name=name, description=f'{name} ({kind})', user=user)
+                for name, (kind, amounts, descriptions) in CATEGORIES.items()
+            )
+            created = self.create_transactions(user, categories, today, options)
+            self.create_budgets(user, categories, today, options['months'])
+
+            # bulk_create skips the signals that maintain these
+            rollups.rebuild(user)
+            bump_version(user.pk)
+            self.stdout.write(f'{user.username}: {created} transactions')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {len(users)} users'))
+        self.stdout.write(f'Password: {options["password"]}')
+
+    def create_transactions(self, user, categories, today, options):
+        batch = []
+        created = 0
+        for transaction in self.transactions(user, categories, today, options['transactions'], options['months']):
+            batch.append(transaction)
+            if len(batch) >= options['batch_size']:
+                Transaction.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            Transaction.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+    def transactions(self, user, categories, today, count, months):
+        recurring = [category for category in categories if category.name in MONTHLY]
+        others = [category for category in categories if category.name not in MONTHLY]
+        weights = [1 if CATEGORIES[category.name][0] == 'income' else 6 for category in others]
+
+        produced = 0
+        for offset in range(min(months, count // max(len(recurring), 1))):
+            year, month = add_months(today.year, today.month, -offset)
+            day = date(year, month, 1)
+            for category in recurring:
+                yield self.transaction(user, category, day)
+                produced += 1
+
+        span = months * 30
+        for _ in range(count - produced):
+            category = random.choices(others, weights)[0]
+            yield self.transaction(user, category, today - timedelta(days=random.randint(0, span)))
+
+    def transaction(self, user, category, day):
+        kind, (low, high), descriptions = CATEGORIES[category.name]
+        return Transaction(
+            user=user,
+            amount=Decimal(random.randint(low * 100, high * 100)) / 100,
+            description=random.choice(descriptions),
+            category=category,
+            transaction_type=kind,
+            date=day
+        )
+
+    def create_budgets(self, user, categories, today, months):
+        budgets = []
+        for offset in range(min(months, 12)):
+            year, month = add_months(today.year, today.month, -offset)
+            for category in categories:
+                kind, (low, high), descriptions = CATEGORIES[category.name]
+                if kind == 'expense':
+                    budgets.append(Budget(
+                        user=user, category=category, month=month, year=year,
+                        amount=Decimal(high * random.randint(5, 20))
+                    ))
+        Budget.objects.bulk_create(budgets)
@@ -1,6 +1,7 @@
 # We'll use Django's built-in User model
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -8,3 +9,35 @@ class UserProfile(models.Model):
     
     def __str__(self):
         return self.user.username
+
+class DataVersion(models.Model):
+    """
+    Counter bumped on every write to a user's transactions, categories or
+    budgets. Cached responses are keyed on it, so any write invalidates them.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='data_version')
+    version = models.PositiveBigIntegerField(default=1)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.user.username} v{self.version}"
+
+class Tombstone(models.Model):
+    """
+    Record of a deleted transaction, category or budget, so that sync
+    clients can drop their copy of it
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='tombstones')
+    model = models.CharField(max_length=20)  # 'transaction', 'category' or 'budget'
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+    # Data version of the delete, for delta sync
+    version = models.PositiveBigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'version', 'id'], name='tombstone_user_version_idx'),
+        ]
@@ -5,5 +5,5 @@ class IsOwner(permissions.BasePermission):
     Custom permission to only allow owners of an object to access it.
     """
     def has_object_permission(self, request, view, obj):
-        # Check if the user is the owner of the object
-        return obj.user == request.user
\ No newline at end of file
+        # Compare ids, obj.user would fetch the owner's row
+        return obj.user_id == request.user.pk
\ No newline at end of file
@@ -1,3 +1,113 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from transactions.models import Transaction
+from . import authentication
 
-# Create your tests here.
+
+def add_transaction(user, amount='10.00'):
+    return Transaction.objects.create(
+        user=user, amount=Decimal(amount), description='Groceries', transaction_type='expense', date=date(2026, 3, 15)
+    )
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.other = User.objects.create_user('bob', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        add_transaction(self.user)
+
+    def get(self, url, params=None, **headers):
+        return self.client.get(url, params or {}, headers=headers)
+
+    def test_unchanged_data_answers_304(self):
+        for url in ['/api/transactions/', '/api/transactions/dashboard/', '/api/budgets/', '/api/budgets/summary/']:
+            with self.subTest(url=url):
+                first = self.get(url)
+                self.assertEqual(first.status_code, 200)
+                self.assertIn('ETag', first.headers)
+                self.assertIn('Last-Modified', first.headers)
+
+                again = self.get(url, if_none_match=first.headers['ETag'])
+                self.assertEqual(again.status_code, 304)
+                self.assertEqual(again.headers['ETag'], first.headers['ETag'])
+                self.assertEqual(self.get(url, if_modified_since=first.headers['Last-Modified']).status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        etag = self.get('/api/transactions/').headers['ETag']
+        add_transaction(self.user, '3.00')
+        response = self.get('/api/transactions/', if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_other_users_writes_keep_the_etag(self):
+        etag = self.get('/api/transactions/').headers['ETag']
+        add_transaction(self.other)
+        self.assertEqual(self.get('/api/transactions/', if_none_match=etag).status_code, 304)
+
+    def test_etag_covers_the_query_string(self):
+        etag = self.get('/api/transactions/').headers['ETag']
+        response = self.get('/api/transactions/', {'min_amount': '5'}, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_invalid_parameters_get_400_without_validators(self):
+        cases = [
+            ('/api/transactions/', {'min_amount': 'lots'}),
+            ('/api/transactions/analytics/', {'start_date': 'yesterday'}),
+            ('/api/budgets/summary/', {'month': 'march', 'year': '2026'}),
+            ('/api/budgets/alerts/', {'since': 'last week'}),
+        ]
+        for url, params in cases:
+            with self.subTest(url=url):
+                response = self.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertNotIn('ETag', response.headers)
+                self.assertNotIn('Last-Modified', response.headers)
+
+                # Even with validators that match whatever the data version is
+                response = self.get(url, params, if_none_match='*', if_modified_since='Fri, 01 Jan 2100 00:00:00 GMT')
+                self.assertEqual(response.status_code, 400)
+
+
+class TokenAuthenticationTests(TestCase):
+    def setUp(self):
+        authentication._user_rows.clear()
+        self.user = User.objects.create_user('alice', password='secret')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def tearDown(self):
+        authentication._user_rows.clear()
+
+    def test_cached_user_needs_no_query(self):
+        first = self.client.get('/api/budgets/')
+        self.assertEqual(first.status_code, 200)
+        # Only the data version lookup answering the 304
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/budgets/', headers={'if_none_match': first.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_inactive_user(self):
+        for ttl in (authentication.DEFAULT_TTL, 0):
+            with self.subTest(ttl=ttl), override_settings(JWT_USER_CACHE_TTL=ttl):
+                self.user.is_active = True
+                self.user.save()
+                self.assertEqual(self.client.get('/api/budgets/').status_code, 200)
+                self.user.is_active = False
+                self.user.save()
+                self.assertEqual(self.client.get('/api/budgets/').status_code, 401)
+
+    def test_deleted_user(self):
+        for ttl in (authentication.DEFAULT_TTL, 0):
+            with self.subTest(ttl=ttl), override_settings(JWT_USER_CACHE_TTL=ttl):
+                user = User.objects.create_user(f'bob{ttl}', password='secret')
+                self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+                self.assertEqual(self.client.get('/api/budgets/').status_code, 200)
+                user.delete()
+                self.assertEqual(self.client.get('/api/budgets/').status_code, 401)
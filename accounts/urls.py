@@ -13,4 +13,7 @@ urlpatterns = [
     path('me/', views.CurrentUserView.as_view(), name='current-user'),
     path('profile/', views.UserProfileView.as_view(), name='user-profile'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
+    
+    # Response cache counters (staff only)
+    path('cache-stats/', views.CacheStatsView.as_view(), name='cache-stats'),
 ]
\ No newline at end of file
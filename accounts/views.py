@@ -5,6 +5,8 @@ from rest_framework_simplejwt.tokens import RefreshToken # type: ignore
 from django.contrib.auth.models import User
 from .models import UserProfile
 from .serializers import UserSerializer, UserProfileSerializer
+from .cache import stats
+from .authentication import full_user
 
 class RegisterView(generics.CreateAPIView):
     """
@@ -48,7 +50,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         # Get or create profile for the current user
-        profile, created = UserProfile.objects.get_or_create(user=self.request.user)
+        profile, created = UserProfile.objects.select_related('user').get_or_create(user_id=self.request.user.pk)
         return profile
 
 class CurrentUserView(APIView):
@@ -58,7 +60,7 @@ class CurrentUserView(APIView):
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request):
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(full_user(request.user))
         return Response(serializer.data)
 
 class LogoutView(APIView):
@@ -74,4 +76,13 @@ class LogoutView(APIView):
             token.blacklist()
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
-            return Response(status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+
+class CacheStatsView(APIView):
+    """
+    Hit/miss counters of the per-user response cache
+    """
+    permission_classes = [permissions.IsAdminUser]
+    
+    def get(self, request):
+        return Response(stats())
\ No newline at end of file
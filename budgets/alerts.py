@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .models import Budget, BudgetAlert
+from .progress import spent_subquery
+
+
+def thresholds():
+    return getattr(settings, 'BUDGET_ALERT_THRESHOLDS', (80, 100))
+
+
+def crossed(budget):
+    """
+    Thresholds a budget from with_spent is currently at or past
+    """
+    spent = budget.spent or 0
+    if spent <= 0:
+        return set()
+    return {threshold for threshold in thresholds() if spent * 100 >= budget.amount * threshold}
+
+
+def parse_since(query):
+    """
+    The ?since= datetime (None without one); raises ValueError with the
+    message for a 400 response
+    """
+    since = query.get('since')
+    if not since:
+        return None
+    try:
+        since = parse_datetime(since)
+    except ValueError:
+        since = None
+    if since is None:
+        raise ValueError("Invalid since, use an ISO 8601 datetime")
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def with_spent(queryset):
+    return queryset.annotate(spent=spent_subquery())
+
+
+def evaluate(budgets):
+    """
+    Bring the alerts of a Budget queryset in line with its current spending:
+    record the thresholds newly crossed and drop those it fell back under,
+    so crossing one again alerts again. Returns the alerts created.
+    """
+    budgets = list(with_spent(budgets.order_by()))
+    if not budgets:
+        return []
+
+    existing = {
+        (budget_id, threshold): pk
+        for pk, budget_id, threshold in BudgetAlert.objects.filter(
+            budget__in=[budget.pk for budget in budgets]
+        ).values_list('pk', 'budget_id', 'threshold')
+    }
+
+    created, cleared = [], []
+    for budget in budgets:
+        current = crossed(budget)
+        for threshold in thresholds():
+            key = (budget.pk, threshold)
+            if threshold in current and key not in existing:
+                created.append(BudgetAlert(
+                    user_id=budget.user_id,
+                    budget=budget,
+                    threshold=threshold,
+                    spent=budget.spent,
+                    amount=budget.amount
+                ))
+            elif threshold not in current and key in existing:
+                cleared.append(existing[key])
+
+    BudgetAlert.objects.filter(pk__in=cleared).delete()
+    # A concurrent write may have recorded the same crossing first
+    BudgetAlert.objects.bulk_create(created, ignore_conflicts=True)
+    return created
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Re-evaluate only the budgets whose (user, category, month) expense
+    rollup changed in a batch of rollup deltas. Writes that don't touch a
+    categorized expense cost nothing.
+    """
+    keys = {
+        (user_id, category_id, year, month)
+        for (user_id, category_id, transaction_type, year, month), (amount, count) in deltas.items()
+        if transaction_type == 'expense' and category_id is not None and amount
+    }
+    if not keys:
+        return []
+    if len(keys) == 1:
+        [(user_id, category_id, year, month)] = keys
+        return evaluate(Budget.objects.filter(user_id=user_id, category_id=category_id, year=year, month=month))
+
+    # Narrow down with IN lists on the unique index columns, then pick the
+    # exact keys, rather than OR-ing together one condition per key
+    candidates = Budget.objects.filter(
+        user_id__in={key[0] for key in keys},
+        category_id__in={key[1] for key in keys},
+        year__in={key[2] for key in keys},
+        month__in={key[3] for key in keys}
+    ).values_list('pk', 'user_id', 'category_id', 'year', 'month')
+    affected = [pk for pk, *key in candidates if tuple(key) in keys]
+    if not affected:
+        return []
+    return evaluate(Budget.objects.filter(pk__in=affected))
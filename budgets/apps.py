@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class BudgetsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'budgets'
+    
+    def ready(self):
+        from transactions import sync
+        from . import signals  # noqa: F401
+        from .models import Budget
+        from .serializers import sync_row
+        sync.register_stream('budgets', 'budget', Budget.objects.all(), ['id', 'category', 'amount', 'month', 'year'], sync_row)
@@ -0,0 +1,97 @@
+from django.db import transaction
+from accounts.cache import next_version, next_versions
+from .models import Budget
+from . import alerts
+
+UNIQUE_FIELDS = ['user', 'category', 'month', 'year']
+BATCH_SIZE = 1000
+MAX_BULK_BUDGETS = 1000
+
+
+def upsert_budgets(user, rows):
+    """
+    Create or update a user's budgets from validated BudgetSerializer data
+    with one INSERT ... ON CONFLICT per batch against the (user, category,
+    month, year) unique constraint. Later rows win over earlier ones for the
+    same budget. Returns the saved budgets.
+    """
+    by_key = {}
+    for row in rows:
+        by_key[row['category'].pk, row['month'], row['year']] = Budget(user=user, **row)
+    budgets = list(by_key.values())
+    if not budgets:
+        return budgets
+
+    with transaction.atomic():
+        # bulk_create skips Budget.save and its post_save, do what they would
+        version = next_version(user.pk)
+        for budget in budgets:
+            budget.version = version
+        Budget.objects.bulk_create(
+            budgets,
+            batch_size=BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=UNIQUE_FIELDS,
+            update_fields=['amount', 'updated_at', 'version']
+        )
+        alerts.evaluate(Budget.objects.filter(
+            user=user,
+            category_id__in={budget.category_id for budget in budgets},
+            year__in={budget.year for budget in budgets},
+            month__in={budget.month for budget in budgets}
+        ))
+    return budgets
+
+
+def copy_budgets(source, target, user=None, overwrite=False, batch_size=BATCH_SIZE):
+    """
+    Copy every budget of the (year, month) source period to the target
+    period, for one user or everyone. Budgets that already exist in the
+    target period keep their amount unless overwrite is set. Returns
+    (copied, created): the source budgets and how many of them were new in
+    the target period.
+    """
+    (source_year, source_month), (target_year, target_month) = source, target
+    budgets = Budget.objects.filter(year=source_year, month=source_month)
+    targets = Budget.objects.filter(year=target_year, month=target_month)
+    if user is not None:
+        budgets = budgets.filter(user=user)
+        targets = targets.filter(user=user)
+
+    if overwrite:
+        conflicts = {'update_conflicts': True, 'unique_fields': UNIQUE_FIELDS, 'update_fields': ['amount', 'updated_at', 'version']}
+    else:
+        conflicts = {'ignore_conflicts': True}
+
+    def save(batch):
+        Budget.objects.bulk_create(batch, **conflicts)
+        return len(batch)
+
+    with transaction.atomic():
+        existing = targets.count()
+        # Copies that end up ignored still bump the version; that only
+        # costs their users a cache miss
+        versions = next_versions(budgets.values_list('user_id', flat=True).distinct())
+        copied = 0
+        batch = []
+        rows = budgets.values_list('user_id', 'category_id', 'amount').order_by('pk')
+        for user_id, category_id, amount in rows.iterator(chunk_size=batch_size):
+            batch.append(Budget(
+                user_id=user_id,
+                category_id=category_id,
+                amount=amount,
+                month=target_month,
+                year=target_year,
+                version=versions[user_id]
+            ))
+            if len(batch) >= batch_size:
+                copied += save(batch)
+                batch = []
+        if batch:
+            copied += save(batch)
+
+        created = targets.count() - existing
+        if created or (copied and overwrite):
+            # bulk_create sends no post_save, do what its receiver would
+            alerts.evaluate(targets)
+    return copied, created
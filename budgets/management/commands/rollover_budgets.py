@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.utils import timezone
+from transactions.dashboard import add_months
+from budgets.bulk import copy_budgets, BATCH_SIZE
+
+
+def parse_period(value):
+    try:
+        year, month = (int(part) for part in value.split('-'))
+    except ValueError:
+        raise CommandError(f'Invalid month "{value}", use YYYY-MM')
+    if not 1 <= month <= 12:
+        raise CommandError(f'Invalid month "{value}", use YYYY-MM')
+    return year, month
+
+
+class Command(BaseCommand):
+    help = (
+        'Copies every budget of one month to another for all users (or one), '
+        'by default from the current month to the next'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='source', help='Month to copy from, YYYY-MM (default: this month)')
+        parser.add_argument('--to', dest='target', help='Month to copy to, YYYY-MM (default: the month after --from)')
+        parser.add_argument('--user', help='Only roll over the budgets of this username')
+        parser.add_argument('--overwrite', action='store_true', help='Replace the amounts of budgets already set for the target month')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        today = timezone.now().date()
+        source = parse_period(options['source']) if options['source'] else (today.year, today.month)
+        target = parse_period(options['target']) if options['target'] else add_months(*source, 1)
+        if source == target:
+            raise CommandError('Source and target month must differ')
+
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+
+        copied, created = copy_budgets(
+            source, target, user=user, overwrite=options['overwrite'], batch_size=options['batch_size']
+        )
+
+        scope = f'user "{user.username}"' if user else 'all users'
+        self.stdout.write(self.style.SUCCESS(
+            f'Copied {copied} budgets from {source[0]}-{source[1]:02d} to {target[0]}-{target[1]:02d} '
+            f'for {scope}, {created} new'
+        ))
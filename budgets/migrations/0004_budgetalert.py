@@ -0,0 +1,65 @@
+# Generated by Django 5.2 on 2026-10-18 13:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def record_crossed_thresholds(apps, schema_editor):
+    # Alerts for budgets already past a threshold; later ones come from writes
+    Budget = apps.get_model('budgets', 'Budget')
+    BudgetAlert = apps.get_model('budgets', 'BudgetAlert')
+    MonthlyRollup = apps.get_model('transactions', 'MonthlyRollup')
+    expenses = MonthlyRollup.objects.filter(
+        user=OuterRef('user'),
+        category=OuterRef('category'),
+        transaction_type='expense',
+        year=OuterRef('year'),
+        month=OuterRef('month')
+    ).values('total')[:1]
+    budgets = Budget.objects.annotate(
+        spent=Subquery(expenses, output_field=models.DecimalField(max_digits=14, decimal_places=2))
+    ).filter(spent__gt=0)
+
+    alerts = []
+    for budget in budgets.iterator():
+        for threshold in getattr(settings, 'BUDGET_ALERT_THRESHOLDS', (80, 100)):
+            if budget.spent * 100 >= budget.amount * threshold:
+                alerts.append(BudgetAlert(
+                    user_id=budget.user_id,
+                    budget_id=budget.pk,
+                    threshold=threshold,
+                    spent=budget.spent,
+                    amount=budget.amount
+                ))
+    BudgetAlert.objects.bulk_create(alerts, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0003_budget_updated_at'),
+        ('transactions', '0011_category_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BudgetAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.IntegerField()),
+                ('spent', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('budget', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='budgets.budget')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='budget_alert_user_created_idx')],
+                'unique_together': {('budget', 'threshold')},
+            },
+        ),
+        migrations.RunPython(record_crossed_thresholds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 14:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budgets', '0004_budgetalert'),
+        ('transactions', '0014_sync_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='budget',
+            name='budget_user_updated_idx',
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='budget',
+            index=models.Index(fields=['user', 'version', 'id'], name='budget_user_version_idx'),
+        ),
+    ]
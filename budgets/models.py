@@ -1,5 +1,6 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from accounts.cache import next_version
 from transactions.models import Category
 
 class Budget(models.Model):
@@ -8,9 +9,47 @@ class Budget(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     month = models.IntegerField()  # 1-12
     year = models.IntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+    # Data version of the write that last changed it, for delta sync
+    version = models.PositiveBigIntegerField(default=0)
     
     def __str__(self):
         return f"{self.category.name} - {self.month}/{self.year}"
     
+    def save(self, *args, **kwargs):
+        # Commit the budget together with the alerts its post_save evaluates
+        with transaction.atomic(using=kwargs.get('using')):
+            self.version = next_version(self.user_id)
+            if kwargs.get('update_fields'):
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+            super().save(*args, **kwargs)
+    
+    class Meta:
+        unique_together = ('user', 'category', 'month', 'year')
+        indexes = [
+            models.Index(fields=['user', 'year', 'month'], name='budget_user_period_idx'),
+            # Delta sync
+            models.Index(fields=['user', 'version', 'id'], name='budget_user_version_idx'),
+        ]
+
+class BudgetAlert(models.Model):
+    """
+    A budget's spending crossing one of the alert thresholds (a percentage
+    of its amount), kept while the spending stays past it
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='budget_alerts')
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name='alerts')
+    threshold = models.IntegerField()
+    # Spending and budget amount when the threshold was crossed
+    spent = models.DecimalField(max_digits=14, decimal_places=2)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.budget} - {self.threshold}%"
+    
     class Meta:
-        unique_together = ('user', 'category', 'month', 'year')
\ No newline at end of file
+        unique_together = ('budget', 'threshold')
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='budget_alert_user_created_idx'),
+        ]
@@ -0,0 +1,70 @@
+from django.db.models import OuterRef, Subquery, DecimalField
+from transactions.models import MonthlyRollup
+
+
+def spent_subquery():
+    """
+    Correlated subquery reading the expense rollup that counts against a budget
+    """
+    expenses = MonthlyRollup.objects.filter(
+        user=OuterRef('user'),
+        category=OuterRef('category'),
+        transaction_type='expense',
+        year=OuterRef('year'),
+        month=OuterRef('month')
+    ).values('total')[:1]
+    return Subquery(expenses, output_field=DecimalField(max_digits=14, decimal_places=2))
+
+
+def with_progress(queryset):
+    """
+    Annotate the spent amount onto a Budget queryset so every budget's
+    spending is fetched in the same query as the budgets themselves
+    """
+    return queryset.select_related('category').annotate(spent=spent_subquery())
+
+
+def progress_fields(budget):
+    """
+    Spent, remaining and percentage used for a budget from with_progress.
+    The derived values use Decimal arithmetic so they do not depend on the
+    database's numeric handling.
+    """
+    spent = budget.spent or 0
+    remaining = budget.amount - spent
+    percentage_used = (spent / budget.amount * 100) if budget.amount > 0 else 0
+    return {
+        'spent': spent,
+        'remaining': remaining,
+        'percentage_used': percentage_used
+    }
+
+
+def progress_data(budget):
+    """
+    Flat representation of a budget from with_progress used by the budget endpoints
+    """
+    return {
+        'id': budget.id,
+        'category': budget.category_id,
+        'category_name': budget.category.name,
+        'amount': budget.amount,
+        'month': budget.month,
+        'year': budget.year,
+        **progress_fields(budget)
+    }
+
+
+def summary_period(query, today):
+    """
+    (month, year) from ?month= and ?year=, the current month unless both
+    are given; raises ValueError with the message for a 400 response
+    """
+    month = query.get('month')
+    year = query.get('year')
+    if not month or not year:
+        return today.month, today.year
+    try:
+        return int(month), int(year)
+    except ValueError:
+        raise ValueError("Invalid month or year format")
@@ -1,9 +1,11 @@
 from rest_framework import serializers
-from .models import Budget
+from .models import Budget, BudgetAlert
 from transactions.models import Category
-from transactions.serializers import CategorySerializer
+from transactions.serializers import AMOUNT_FIELD, CategorySerializer
+from transactions.categories import UserCategoryField
 
 class BudgetSerializer(serializers.ModelSerializer):
+    category = UserCategoryField()
     category_name = serializers.CharField(source='category.name', read_only=True)
     
     class Meta:
@@ -16,6 +18,32 @@ class BudgetSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
+class BudgetAlertSerializer(serializers.ModelSerializer):
+    category = serializers.IntegerField(source='budget.category_id', read_only=True)
+    category_name = serializers.CharField(source='budget.category.name', read_only=True)
+    month = serializers.IntegerField(source='budget.month', read_only=True)
+    year = serializers.IntegerField(source='budget.year', read_only=True)
+    
+    class Meta:
+        model = BudgetAlert
+        fields = [
+            'id', 'budget', 'category', 'category_name', 'month', 'year',
+            'threshold', 'spent', 'amount', 'created_at'
+        ]
+        read_only_fields = fields
+
+class BudgetCopySerializer(serializers.Serializer):
+    from_month = serializers.IntegerField(min_value=1, max_value=12)
+    from_year = serializers.IntegerField()
+    to_month = serializers.IntegerField(min_value=1, max_value=12)
+    to_year = serializers.IntegerField()
+    overwrite = serializers.BooleanField(default=False)
+    
+    def validate(self, data):
+        if (data['from_month'], data['from_year']) == (data['to_month'], data['to_year']):
+            raise serializers.ValidationError("Source and target month must differ")
+        return data
+
 class BudgetSummarySerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name')
     spent = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
@@ -28,4 +56,10 @@ class BudgetSummarySerializer(serializers.ModelSerializer):
             'id', 'category', 'category_name', 'amount', 
             'month', 'year', 'spent', 'remaining', 'percentage_used'
         ]
-        read_only_fields = ['id', 'spent', 'remaining', 'percentage_used']
\ No newline at end of file
+        read_only_fields = ['id', 'spent', 'remaining', 'percentage_used']
+
+
+def sync_row(row):
+    # Budget rows in delta sync (transactions.sync)
+    row['amount'] = AMOUNT_FIELD.to_representation(row['amount'])
+    return row
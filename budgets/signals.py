@@ -0,0 +1,36 @@
+from django.db.models.signals import post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from transactions import rollups, sync
+from transactions.models import Category
+from .models import Budget
+from . import alerts
+
+
+@receiver(post_delete, sender=Budget)
+def record_budget_deletion(sender, instance, origin=None, **kwargs):
+    if not sync.deleted_with(origin, Category):
+        sync.record_deletion(instance, 'budget', origin)
+
+
+@receiver(pre_delete, sender=Category)
+def record_budget_deletions_on_category_delete(sender, instance, origin=None, **kwargs):
+    # The category's budgets are deleted with it; one INSERT for all their tombstones
+    if not sync.deleting_user(origin):
+        sync.record_deletions(instance.budgets.values_list('user_id', 'pk'), 'budget')
+
+
+@receiver(post_save, sender=Budget)
+def evaluate_budget_alerts(sender, instance, raw=False, **kwargs):
+    # A new or changed amount can cross a threshold without any new spending
+    if not raw:
+        alerts.evaluate(Budget.objects.filter(pk=instance.pk))
+
+
+@receiver(rollups.rollups_changed)
+def evaluate_budget_alerts_on_spending(sender, deltas, **kwargs):
+    alerts.apply_rollup_deltas(deltas)
+
+
+@receiver(rollups.rollups_rebuilt)
+def evaluate_budget_alerts_on_rebuild(sender, user, **kwargs):
+    alerts.evaluate(Budget.objects.all() if user is None else Budget.objects.filter(user=user))
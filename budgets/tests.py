@@ -1,3 +1,173 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from transactions.models import Category, Transaction
+from .models import Budget, BudgetAlert
+from . import alerts
 
-# Create your tests here.
+
+@override_settings(BUDGET_ALERT_THRESHOLDS=[80, 100])
+class BudgetAlertTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.create(user=self.user, name='Food')
+        self.budget = Budget.objects.create(user=self.user, category=self.food, amount=Decimal('100.00'), month=3, year=2026)
+
+    def spend(self, amount, category=None, transaction_type='expense', day=date(2026, 3, 10)):
+        return Transaction.objects.create(
+            user=self.user, amount=Decimal(amount), description='Spending',
+            category=category or self.food, transaction_type=transaction_type, date=day
+        )
+
+    def thresholds(self):
+        maintained = sorted(BudgetAlert.objects.values_list('budget_id', 'threshold'))
+        # What evaluating every budget from scratch records
+        BudgetAlert.objects.all().delete()
+        alerts.evaluate(Budget.objects.all())
+        self.assertEqual(sorted(BudgetAlert.objects.values_list('budget_id', 'threshold')), maintained)
+        return [threshold for budget_id, threshold in maintained]
+
+    def test_crossing_thresholds(self):
+        self.spend('79.99')
+        self.assertEqual(self.thresholds(), [])
+        lunch = self.spend('0.01')
+        self.assertEqual(self.thresholds(), [80])
+        self.spend('20.00')
+        self.assertEqual(self.thresholds(), [80, 100])
+        alert = BudgetAlert.objects.get(threshold=100)
+        self.assertEqual((alert.spent, alert.amount), (Decimal('100.00'), Decimal('100.00')))
+
+        # Falling back under a threshold clears it, crossing it again alerts again
+        lunch.delete()
+        self.assertEqual(self.thresholds(), [80])
+        lunch = self.spend('0.01')
+        self.assertEqual(self.thresholds(), [80, 100])
+
+        lunch.date = date(2026, 4, 1)
+        lunch.save()
+        self.assertEqual(self.thresholds(), [80])
+
+    def test_other_spending_does_not_alert(self):
+        self.spend('500.00', transaction_type='income')
+        self.spend('500.00', category=Category.objects.create(user=self.user, name='Rent'))
+        self.spend('500.00', day=date(2026, 4, 1))
+        self.assertEqual(self.thresholds(), [])
+
+    def test_budget_changes(self):
+        self.spend('90.00')
+        self.budget.amount = Decimal('200.00')
+        self.budget.save()
+        self.assertEqual(self.thresholds(), [])
+
+        response = self.client.post('/api/budgets/bulk/', [
+            {'category': self.food.pk, 'amount': '90.00', 'month': 3, 'year': 2026}
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.thresholds(), [80, 100])
+
+    def test_imports_alert(self):
+        response = self.client.post('/api/transactions/import/', [
+            {'amount': '45.00', 'description': 'Groceries', 'category': self.food.pk,
+             'transaction_type': 'expense', 'date': '2026-03-0%d' % day}
+            for day in (1, 2)
+        ], format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.thresholds(), [80])
+
+    def test_alerts_endpoint(self):
+        other = User.objects.create_user('bob', password='secret')
+        other_food = Category.objects.create(user=other, name='Food')
+        Budget.objects.create(user=other, category=other_food, amount=Decimal('10.00'), month=3, year=2026)
+        Transaction.objects.create(
+            user=other, amount=Decimal('10.00'), description='Spending', category=other_food,
+            transaction_type='expense', date=date(2026, 3, 1)
+        )
+        self.spend('85.00')
+
+        response = self.client.get('/api/budgets/alerts/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(row['budget'], row['threshold']) for row in response.data['results']], [(self.budget.pk, 80)])
+
+        since = (timezone.now() + timedelta(minutes=1)).isoformat()
+        response = self.client.get('/api/budgets/alerts/', {'since': since})
+        self.assertEqual(response.data['results'], [])
+        self.assertEqual(self.client.get('/api/budgets/alerts/', {'since': 'soon'}).status_code, 400)
+
+
+class BulkBudgetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.food = Category.objects.create(user=self.user, name='Food')
+        self.rent = Category.objects.create(user=self.user, name='Rent')
+        self.fun = Category.objects.create(user=self.user, name='Fun')
+        self.budget = Budget.objects.create(user=self.user, category=self.food, amount=Decimal('100.00'), month=3, year=2026)
+
+    def upsert(self, rows):
+        return self.client.post('/api/budgets/bulk/', [
+            {'category': category.pk, 'amount': amount, 'month': month, 'year': 2026}
+            for category, amount, month in rows
+        ], format='json')
+
+    def copy(self, **data):
+        return self.client.post('/api/budgets/copy/', {
+            'from_month': 3, 'from_year': 2026, 'to_month': 4, 'to_year': 2026, **data
+        }, format='json')
+
+    def test_upsert_returns_ids_in_input_order(self):
+        rows = [(self.rent, '900.00', 3), (self.food, '150.00', 3), (self.fun, '40.00', 3), (self.rent, '950.00', 4)]
+        response = self.upsert(rows)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row['id'] for row in response.data],
+            [Budget.objects.get(category=category, month=month).pk for category, amount, month in rows]
+        )
+        self.assertEqual([row['amount'] for row in response.data], [amount for category, amount, month in rows])
+
+    def test_conflict_update_keeps_the_id(self):
+        response = self.upsert([(self.food, '150.00', 3), (self.food, '175.00', 3)])
+        self.assertEqual(response.status_code, 200)
+        # Later rows win for the same budget
+        self.assertEqual([(row['id'], row['amount']) for row in response.data], [(self.budget.pk, '175.00')])
+        self.assertEqual(Budget.objects.get().pk, self.budget.pk)
+        self.assertEqual(Budget.objects.get().amount, Decimal('175.00'))
+
+    def test_upsert_rejects_other_users_categories(self):
+        other = Category.objects.create(user=User.objects.create_user('bob', password='secret'), name='Food')
+        response = self.upsert([(self.rent, '900.00', 3), (other, '10.00', 3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category', response.data[1])
+        self.assertEqual(list(Budget.objects.values_list('pk', flat=True)), [self.budget.pk])
+
+    def test_copy_skips_existing_budgets(self):
+        Budget.objects.create(user=self.user, category=self.rent, amount=Decimal('900.00'), month=3, year=2026)
+        existing = Budget.objects.create(user=self.user, category=self.food, amount=Decimal('50.00'), month=4, year=2026)
+        other = User.objects.create_user('bob', password='secret')
+        Budget.objects.create(
+            user=other, category=Category.objects.create(user=other, name='Food'), amount=Decimal('10.00'), month=3, year=2026
+        )
+
+        response = self.copy()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'copied': 2, 'created': 1})
+        april = Budget.objects.filter(month=4, year=2026)
+        self.assertEqual(
+            sorted(april.values_list('user_id', 'category_id', 'amount')),
+            [(self.user.pk, self.food.pk, Decimal('50.00')), (self.user.pk, self.rent.pk, Decimal('900.00'))]
+        )
+
+        response = self.copy(overwrite=True)
+        self.assertEqual(response.data, {'copied': 2, 'created': 0})
+        self.assertEqual(april.get(category=self.food).amount, Decimal('100.00'))
+        self.assertEqual(april.get(category=self.food).pk, existing.pk)
+
+    def test_copy_to_the_same_month(self):
+        response = self.copy(to_month=3)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Budget.objects.exclude(pk=self.budget.pk).exists())
@@ -1,12 +1,15 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from django.db.models import Sum, F, ExpressionWrapper, DecimalField, Case, When, Value
 from django.utils import timezone
-from .models import Budget
-from .serializers import BudgetSerializer, BudgetSummarySerializer
-from transactions.models import Transaction
+from .models import Budget, BudgetAlert
+from .serializers import BudgetSerializer, BudgetSummarySerializer, BudgetCopySerializer, BudgetAlertSerializer
+from .bulk import upsert_budgets, copy_budgets, MAX_BULK_BUDGETS
+from .progress import with_progress, progress_fields, progress_data, summary_period
+from .alerts import parse_since
 from accounts.permissions import IsOwner
+from accounts.cache import cached
+from accounts.conditional import conditional
 
 class BudgetViewSet(viewsets.ModelViewSet):
     """
@@ -18,40 +21,88 @@ class BudgetViewSet(viewsets.ModelViewSet):
     def get_queryset(self):
         return Budget.objects.filter(user=self.request.user)
     
+    @conditional()
     def list(self, request, *args, **kwargs):
         """
         Overriding the GET /budgets endpoint to include spending summaries.
         """
-        queryset = self.filter_queryset(self.get_queryset())
+        queryset = with_progress(self.filter_queryset(self.get_queryset()))
         budget_data = []
         
         for budget in queryset:
-            # Calculate total spent for this budget based on its month and year
-            spent = Transaction.objects.filter(
-                user=request.user,
-                category=budget.category,
-                transaction_type='expense',
-                date__month=budget.month,
-                date__year=budget.year
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            remaining = budget.amount - spent
-            percentage_used = (spent / budget.amount * 100) if budget.amount > 0 else 0
-            
             # Serialize the budget object using BudgetSerializer
             serialized_budget = self.get_serializer(budget).data
             
             # Add our extra calculated fields
-            serialized_budget.update({
-                'spent': spent,
-                'remaining': remaining,
-                'percentage_used': percentage_used
-            })
+            serialized_budget.update(progress_fields(budget))
             budget_data.append(serialized_budget)
         
         return Response(budget_data)
     
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_upsert(self, request):
+        """
+        Create or update several budgets from a JSON array. A budget that
+        already exists for the category, month and year gets the new amount.
+        """
+        if not isinstance(request.data, list):
+            return Response(
+                {"error": "Expected a JSON array of budgets"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(request.data) > MAX_BULK_BUDGETS:
+            return Response(
+                {"error": f"At most {MAX_BULK_BUDGETS} budgets per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        budgets = upsert_budgets(request.user, serializer.validated_data)
+        
+        return Response(self.get_serializer(budgets, many=True).data)
+    
+    @action(detail=False, methods=['post'], url_path='copy')
+    def copy_month(self, request):
+        """
+        Copy the budgets of one month to another. Budgets already set for
+        the target month are kept unless "overwrite" is true.
+        """
+        serializer = BudgetCopySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        
+        copied, created = copy_budgets(
+            (data['from_year'], data['from_month']),
+            (data['to_year'], data['to_month']),
+            user=request.user,
+            overwrite=data['overwrite']
+        )
+        
+        return Response({'copied': copied, 'created': created})
+    
+    @action(detail=False, methods=['get'])
+    @conditional(validate=lambda view, request: parse_since(request.query_params))
+    def alerts(self, request):
+        """
+        Budget thresholds crossed by the spending, newest first. They are
+        recorded as expenses and budgets are written, so polling this is a
+        plain indexed read; pass ?since= (an ISO datetime) for only the new ones.
+        """
+        alerts = BudgetAlert.objects.filter(user=request.user).select_related('budget__category')
+        
+        since = request.validated
+        if since is not None:
+            alerts = alerts.filter(created_at__gt=since)
+        
+        alerts = alerts.order_by('-created_at', '-id')
+        page = self.paginate_queryset(alerts)
+        if page is not None:
+            return self.get_paginated_response(BudgetAlertSerializer(page, many=True).data)
+        return Response(BudgetAlertSerializer(alerts, many=True).data)
+    
     @action(detail=False, methods=['get'])
+    @conditional(daily=True)
     def current_month(self, request):
         """
         Get the current month's budget with spending information
@@ -60,90 +111,25 @@ class BudgetViewSet(viewsets.ModelViewSet):
         current_month = today.month
         current_year = today.year
         
-        # Get all budgets for the current month
-        budgets = self.get_queryset().filter(month=current_month, year=current_year)
-        
-        # Calculate spending for each budget category
-        budget_data = []
-        for budget in budgets:
-            # Get total expenses for this category in the current month
-            spent = Transaction.objects.filter(
-                user=request.user,
-                category=budget.category,
-                transaction_type='expense',
-                date__month=current_month,
-                date__year=current_year
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            # Calculate remaining budget and percentage used
-            remaining = budget.amount - spent
-            percentage_used = (spent / budget.amount * 100) if budget.amount > 0 else 0
-            
-            budget_data.append({
-                'id': budget.id,
-                'category': budget.category.id,
-                'category_name': budget.category.name,
-                'amount': budget.amount,
-                'month': budget.month,
-                'year': budget.year,
-                'spent': spent,
-                'remaining': remaining,
-                'percentage_used': percentage_used
-            })
+        # Get all budgets for the current month with their spending
+        budgets = with_progress(self.get_queryset().filter(month=current_month, year=current_year))
+        budget_data = [progress_data(budget) for budget in budgets]
         
         return Response(budget_data)
     
     @action(detail=False, methods=['get'])
+    @conditional(daily=True, validate=lambda view, request: summary_period(request.query_params, timezone.now().date()))
     def summary(self, request):
         """
         Get a summary of all budget categories with spending information
         """
-        month = request.query_params.get('month')
-        year = request.query_params.get('year')
-        
-        if not month or not year:
-            today = timezone.now().date()
-            month = today.month
-            year = today.year
-        else:
-            try:
-                month = int(month)
-                year = int(year)
-            except ValueError:
-                return Response(
-                    {"error": "Invalid month or year format"},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+        month, year = request.validated
         
-        # Get all budgets for the specified month
-        budgets = self.get_queryset().filter(month=month, year=year)
-        
-        # Calculate spending for each budget category
-        budget_summary = []
-        for budget in budgets:
-            # Get total expenses for this category in the specified month
-            spent = Transaction.objects.filter(
-                user=request.user,
-                category=budget.category,
-                transaction_type='expense',
-                date__month=month,
-                date__year=year
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            # Calculate remaining budget and percentage used
-            remaining = budget.amount - spent
-            percentage_used = (spent / budget.amount * 100) if budget.amount > 0 else 0
-            
-            budget_summary.append({
-                'id': budget.id,
-                'category': budget.category.id,
-                'category_name': budget.category.name,
-                'amount': budget.amount,
-                'month': budget.month,
-                'year': budget.year,
-                'spent': spent,
-                'remaining': remaining,
-                'percentage_used': percentage_used
-            })
+        # Get all budgets for the specified month with their spending
+        budgets = with_progress(self.get_queryset().filter(month=month, year=year))
+        budget_summary, hit = cached(
+            request.user, 'budget-summary', [month, year],
+            lambda: [progress_data(budget) for budget in budgets]
+        )
         
-        return Response(budget_summary)
\ No newline at end of file
+        return Response(budget_summary, headers={'X-Cache': 'HIT' if hit else 'MISS'})
\ No newline at end of file
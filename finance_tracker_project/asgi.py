@@ -3,6 +3,20 @@ ASGI config for finance_tracker_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+In ASGI mode the dashboard runs as an async view (see asgi_urls.py) that
+issues its independent queries concurrently on a fixed set of query threads
+keeping their database connections (accounts/asynchronous.py). Every other
+endpoint is the regular sync view. Serve it with uvicorn:
+
+    uvicorn finance_tracker_project.asgi:application --host 0.0.0.0 --port $PORT --workers 4
+
+or with gunicorn managing uvicorn workers (needs the uvicorn-worker package):
+
+    gunicorn finance_tracker_project.asgi:application -k uvicorn_worker.UvicornWorker --workers 4
+
+`python manage.py benchmark_asgi` compares its throughput with the WSGI
+deployment in the Procfile.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -10,7 +24,21 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 import os
 
 from django.core.asgi import get_asgi_application
+from django.core.signals import request_finished
+from django.db import connections
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finance_tracker_project.settings')
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'finance_tracker_project.asgi_urls')
 
 application = get_asgi_application()
+
+
+def close_request_connections(**kwargs):
+    # Sync views run on a fresh thread per request under ASGI, so a
+    # connection they opened could never be reused; close it with the
+    # request. The async views' query threads don't send request_finished
+    # and keep theirs for CONN_MAX_AGE.
+    connections.close_all()
+
+
+request_finished.connect(close_request_connections)
@@ -0,0 +1,11 @@
+"""
+URL configuration used in ASGI mode (see asgi.py): the dashboard is served
+by an async view, everything else by the regular DRF views.
+"""
+from django.urls import path
+from transactions import async_views as transaction_views
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/transactions/dashboard/', transaction_views.dashboard),
+] + sync_urlpatterns
@@ -0,0 +1,174 @@
+import json
+import logging
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger('finance_tracker.requests')
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Add a Server-Timing header with db/render/total durations
+    'SERVER_TIMING': True,
+    # Queries allowed per request before it is flagged, overridable per view name
+    'QUERY_BUDGET': 20,
+    'QUERY_BUDGETS': {},
+    # Requests slower than this are flagged as well
+    'SLOW_REQUEST_MS': 500,
+    # How many of the slowest statements to include in the log line
+    'SLOWEST_QUERIES': 3,
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_INSTRUMENTATION', {})}
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper hook counting and timing every statement
+    """
+    def __init__(self, keep):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+        # Async views can run queries on several threads at once
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            with self.lock:
+                self.count += 1
+                self.duration += elapsed
+                if self.keep:
+                    self.slowest.append((elapsed, sql))
+                    self.slowest.sort(key=lambda item: item[0], reverse=True)
+                    del self.slowest[self.keep:]
+
+
+# Recorder of the async request being handled. Its queries run on worker
+# threads (each with its own connection) that inherit the request's context.
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+def record_current(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_recorder(sender, connection, **kwargs):
+    if record_current not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_current)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Records per request the number of SQL queries, their total time, the
+    slowest statements and the response render (serialization) time. The
+    figures go to a Server-Timing header and a JSON log line on the
+    'finance_tracker.requests' logger: at DEBUG, or at WARNING when a view
+    goes over its query budget or the slow request threshold. Works under
+    WSGI and ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.config = get_config()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+            # Connections are per thread under ASGI; hook every one of them
+            connection_created.connect(install_recorder, dispatch_uid='query-instrumentation')
+            for connection in connections.all(initialized_only=True):
+                install_recorder(None, connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.config['ENABLED']:
+            return self.get_response(request)
+
+        recorder = QueryRecorder(self.config['SLOWEST_QUERIES'])
+        request._render_ms = 0.0
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = (time.perf_counter() - started) * 1000
+
+        self.report(request, response, recorder, total)
+        return response
+
+    async def __acall__(self, request):
+        if not self.config['ENABLED']:
+            return await self.get_response(request)
+
+        recorder = QueryRecorder(self.config['SLOWEST_QUERIES'])
+        request._render_ms = 0.0
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        total = (time.perf_counter() - started) * 1000
+
+        self.report(request, response, recorder, total)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns; time that step
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._render_ms = (time.perf_counter() - started) * 1000
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def report(self, request, response, recorder, total):
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        budget = self.config['QUERY_BUDGETS'].get(view_name, self.config['QUERY_BUDGET'])
+        over_budget = budget is not None and recorder.count > budget
+        slow = total > self.config['SLOW_REQUEST_MS']
+
+        if self.config['SERVER_TIMING']:
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={recorder.duration:.2f};desc="{recorder.count} queries"',
+                f'render;dur={request._render_ms:.2f}',
+                f'total;dur={total:.2f}',
+            ])
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': view_name,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'query_budget': budget,
+            'db_ms': round(recorder.duration, 2),
+            'render_ms': round(request._render_ms, 2),
+            'total_ms': round(total, 2),
+            'slowest_queries': [
+                {'ms': round(elapsed, 2), 'sql': sql[:500]} for elapsed, sql in recorder.slowest
+            ],
+            'over_budget': over_budget,
+            'slow': slow,
+        }
+        level = logging.WARNING if over_budget or slow else logging.DEBUG
+        logger.log(level, json.dumps(record))
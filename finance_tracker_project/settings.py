@@ -13,7 +13,8 @@ SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-a1b2c3d4e5f6g7
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = False
 
-ROOT_URLCONF = 'finance_tracker_project.urls'
+# asgi.py switches to asgi_urls, which serves the dashboard as an async view
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'finance_tracker_project.urls')
 
 ALLOWED_HOSTS = ["*"]
 
@@ -41,6 +42,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'finance_tracker_project.instrumentation.QueryInstrumentationMiddleware',  # Outermost so it sees every query
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware (before CommonMiddleware)
@@ -54,7 +56,7 @@ MIDDLEWARE = [
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # For browsable API
     ),
     'DEFAULT_PERMISSION_CLASSES': [
@@ -69,6 +71,36 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Per-request query/latency instrumentation (see finance_tracker_project/instrumentation.py)
+REQUEST_INSTRUMENTATION = {
+    'ENABLED': True,
+    'SERVER_TIMING': True,
+    'QUERY_BUDGET': 20,
+    'QUERY_BUDGETS': {
+        # Per view name overrides, e.g. 'transaction-dashboard': 5
+    },
+    'SLOW_REQUEST_MS': 500,
+    'SLOWEST_QUERIES': 3,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # Flagged requests log at WARNING, REQUEST_LOG_LEVEL=DEBUG logs every request
+        'finance_tracker.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -124,6 +156,13 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=7),
 }
 
+# Bearer token users are loaded once, rejecting inactive and deleted users,
+# then kept per worker for this many seconds, so most requests make no
+# authentication query (accounts/authentication.py). A deactivation reaches
+# other workers once their copy expires. 0 reads the active flag on every
+# request instead.
+JWT_USER_CACHE_TTL = int(os.environ.get('JWT_USER_CACHE_TTL', 30))
+
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 DATABASES = {
@@ -133,8 +172,88 @@ DATABASES = {
     }
 }
 
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds and checked
+# before reuse. DATABASE_POOL=1 uses psycopg's connection pool instead on
+# Postgres (needs psycopg[pool]; pooling replaces persistent connections).
+DATABASE_CONN_MAX_AGE = int(os.environ.get('DATABASE_CONN_MAX_AGE', 600))
+DATABASE_POOL = os.environ.get('DATABASE_POOL') == '1'
+
 if 'DATABASE_URL' in os.environ:
-    DATABASES['default'] = dj_database_url.config(conn_max_age=600, ssl_require=True)
+    DATABASES['default'] = dj_database_url.config(
+        conn_max_age=0 if DATABASE_POOL else DATABASE_CONN_MAX_AGE,
+        conn_health_checks=True,
+        ssl_require=True
+    )
+else:
+    DATABASES['default']['CONN_MAX_AGE'] = DATABASE_CONN_MAX_AGE
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
+if DATABASE_POOL and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+        'max_size': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+        # Seconds a request waits for a free connection before erroring
+        'timeout': int(os.environ.get('DATABASE_POOL_TIMEOUT', 10)),
+    }
+
+# Threads (and so database connections) per ASGI worker that async views run
+# their queries on, see accounts/asynchronous.py
+ASYNC_QUERY_THREADS = int(os.environ.get('ASYNC_QUERY_THREADS', 8))
+
+# SQLite tuned for several concurrent workers (SQLITE_TUNING=0 turns it off):
+# WAL lets readers run alongside the writer, writes take the lock when their
+# transaction begins (IMMEDIATE) instead of failing a lock upgrade with
+# "database is locked", and a busy writer is waited on for `timeout` seconds
+# (sqlite's busy_timeout). synchronous=NORMAL is durable in WAL mode except
+# across a power loss, and mmap serves reads straight from the page cache.
+if (DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3' and
+        os.environ.get('SQLITE_TUNING', '1') == '1'):
+    DATABASES['default'].setdefault('OPTIONS', {}).update({
+        'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 20)),
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ';'.join([
+            'PRAGMA journal_mode=WAL',
+            'PRAGMA synchronous=NORMAL',
+            'PRAGMA mmap_size={}'.format(int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+            'PRAGMA temp_store=MEMORY',
+        ]),
+    })
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Per-process memory cache by default; set CACHE_DIR for a file cache shared by
+# the workers on one host, or REDIS_URL (needs the redis package) for a shared one.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'finance-tracker',
+    }
+}
+
+if 'REDIS_URL' in os.environ:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['REDIS_URL'],
+    }
+elif 'CACHE_DIR' in os.environ:
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['CACHE_DIR'],
+    }
+
+# Dashboard and budget summary responses, keyed by user and data version
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+# Deletions are kept this long for /api/transactions/sync/ clients (see the
+# prune_tombstones command); clients that synced before that start over
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+# Percentages of a budget's amount that record a budget alert once the
+# month's spending in its category reaches them
+BUDGET_ALERT_THRESHOLDS = [
+    int(threshold) for threshold in os.environ.get('BUDGET_ALERT_THRESHOLDS', '80,100').split(',')
+]
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -0,0 +1,70 @@
+import json
+import logging
+import re
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from transactions.models import Category
+
+
+class QueryInstrumentationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        Category.objects.create(user=self.user, name='Food')
+
+    def get(self, url='/api/transactions/categories/'):
+        # A new client loads the middleware, and so its settings, again
+        client = APIClient()
+        client.force_authenticate(self.user)
+        with self.assertLogs('finance_tracker.requests', logging.DEBUG) as logs:
+            response = client.get(url)
+        self.assertEqual(len(logs.records), 1)
+        return response, logs.records[0]
+
+    def test_server_timing_header(self):
+        response, record = self.get()
+        self.assertEqual(response.status_code, 200)
+        db, render, total = response.headers['Server-Timing'].split(', ')
+        queries = json.loads(record.getMessage())['queries']
+        self.assertRegex(db, rf'^db;dur=\d+\.\d\d;desc="{queries} queries"$')
+        self.assertRegex(render, r'^render;dur=\d+\.\d\d$')
+        self.assertRegex(total, r'^total;dur=\d+\.\d\d$')
+
+    def test_log_fields(self):
+        response, record = self.get()
+        self.assertEqual(record.levelno, logging.DEBUG)
+        fields = json.loads(record.getMessage())
+        self.assertEqual(
+            {key: fields[key] for key in ('method', 'path', 'view', 'status', 'query_budget', 'over_budget', 'slow')},
+            {
+                'method': 'GET', 'path': '/api/transactions/categories/', 'view': 'category-list',
+                'status': 200, 'query_budget': 20, 'over_budget': False, 'slow': False,
+            }
+        )
+        self.assertGreater(fields['queries'], 0)
+        self.assertLessEqual(len(fields['slowest_queries']), 3)
+        self.assertTrue(all(re.match(r'^\s*SELECT', query['sql']) for query in fields['slowest_queries']))
+        self.assertGreaterEqual(fields['total_ms'], fields['db_ms'])
+
+    def test_over_budget(self):
+        with override_settings(REQUEST_INSTRUMENTATION={'QUERY_BUDGETS': {'category-list': 1}}):
+            response, record = self.get()
+        fields = json.loads(record.getMessage())
+        self.assertEqual(record.levelno, logging.WARNING)
+        self.assertEqual(fields['query_budget'], 1)
+        self.assertTrue(fields['over_budget'])
+        self.assertFalse(fields['slow'])
+
+        # Other views keep the default budget
+        with override_settings(REQUEST_INSTRUMENTATION={'QUERY_BUDGETS': {'category-list': 1}}):
+            response, record = self.get('/api/transactions/')
+        self.assertEqual(record.levelno, logging.DEBUG)
+        self.assertFalse(json.loads(record.getMessage())['over_budget'])
+
+    def test_slow_request(self):
+        with override_settings(REQUEST_INSTRUMENTATION={'SLOW_REQUEST_MS': 0}):
+            response, record = self.get()
+        fields = json.loads(record.getMessage())
+        self.assertEqual(record.levelno, logging.WARNING)
+        self.assertTrue(fields['slow'])
+        self.assertFalse(fields['over_budget'])
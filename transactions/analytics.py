@@ -0,0 +1,200 @@
+import calendar
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from django.db.models import Sum
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, TruncYear
+from .models import Transaction, MonthlyRollup
+from .rollups import period_range
+from .dashboard import INCOME, EXPENSE, add_months
+from .balances import CENT
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,  # weeks start on Monday
+    'month': TruncMonth,
+    'year': TruncYear,
+}
+# Buckets returned when no range is given, ending with the current one
+DEFAULT_BUCKETS = 12
+# Largest number of points (buckets x series) a single response may hold
+MAX_POINTS = 5000
+TOTAL = 'total'
+
+
+def bucket_start(day, granularity):
+    """
+    First day of the bucket a date falls in
+    """
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def shift_bucket(start, granularity, delta):
+    """
+    Start of the bucket `delta` buckets after the one starting at `start`
+    """
+    if granularity == 'week':
+        return start + timedelta(weeks=delta)
+    if granularity == 'month':
+        year, month = add_months(start.year, start.month, delta)
+        return date(year, month, 1)
+    if granularity == 'year':
+        return date(start.year + delta, 1, 1)
+    return start + timedelta(days=delta)
+
+
+def bucket_count(start, end, granularity):
+    first, last = bucket_start(start, granularity), bucket_start(end, granularity)
+    if granularity == 'week':
+        return (last - first).days // 7 + 1
+    if granularity == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    if granularity == 'year':
+        return last.year - first.year + 1
+    return (last - first).days + 1
+
+
+def default_range(today, granularity, buckets=DEFAULT_BUCKETS):
+    """
+    The last `buckets` whole buckets up to and including today's
+    """
+    start = shift_bucket(bucket_start(today, granularity), granularity, -(buckets - 1))
+    end = shift_bucket(bucket_start(today, granularity), granularity, 1) - timedelta(days=1)
+    return start, end
+
+
+def covers_whole_months(start, end):
+    return start.day == 1 and end.day == calendar.monthrange(end.year, end.month)[1]
+
+
+def grouped_rows(user, start, end, granularity, by_category):
+    """
+    (period, category id, category name, income, expenses) rows from one
+    grouped query. Month and year buckets over whole months are read from
+    the monthly rollups; anything else is truncated from the transactions.
+    """
+    category_fields = ['category_id', 'category__name'] if by_category else []
+
+    if granularity in ('month', 'year') and covers_whole_months(start, end):
+        period_fields = ['year', 'month'] if granularity == 'month' else ['year']
+        rows = MonthlyRollup.objects.filter(
+            period_range((start.year, start.month), (end.year, end.month)),
+            user=user
+        ).values(*period_fields, *category_fields).annotate(
+            income=Sum('total', filter=INCOME),
+            expenses=Sum('total', filter=EXPENSE),
+        ).order_by()
+        for row in rows:
+            row['period'] = date(row['year'], row.get('month', 1), 1)
+            yield row
+        return
+
+    yield from Transaction.objects.filter(
+        user=user, date__range=(start, end)
+    ).annotate(
+        period=GRANULARITIES[granularity]('date')
+    ).values('period', *category_fields).annotate(
+        income=Sum('amount', filter=INCOME),
+        expenses=Sum('amount', filter=EXPENSE),
+    ).order_by()
+
+
+def point(period, income, expenses):
+    income = income.quantize(CENT) if income else 0
+    expenses = expenses.quantize(CENT) if expenses else 0
+    return {
+        'period': period.isoformat(),
+        'income': income,
+        'expenses': expenses,
+        'net': income - expenses
+    }
+
+
+def check_range(start, end, granularity):
+    """
+    Number of buckets between two dates; raises ValueError when it is more
+    than MAX_POINTS
+    """
+    count = bucket_count(start, end, granularity)
+    if count > MAX_POINTS:
+        raise ValueError(f"The range spans {count} {granularity} buckets, the limit is {MAX_POINTS}")
+    return count
+
+
+def parse_params(query, today):
+    """
+    (granularity, start, end, by_category) from the analytics query
+    parameters; raises ValueError with the message for a 400 response
+    """
+    granularity = query.get('granularity', 'month')
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+
+    start, end = default_range(today, granularity)
+    try:
+        if query.get('start_date'):
+            start = datetime.strptime(query['start_date'], '%Y-%m-%d').date()
+        if query.get('end_date'):
+            end = datetime.strptime(query['end_date'], '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD")
+    if start > end:
+        raise ValueError("start_date must not be after end_date")
+    check_range(start, end, granularity)
+
+    by_category = query.get('by_category', '').lower() in ('1', 'true')
+    return granularity, start, end, by_category
+
+
+def build_series(user, start, end, granularity, by_category=False):
+    """
+    Income/expense/net per bucket between two dates, every bucket present
+    (zero when empty), optionally split into one series per category with
+    transactions in the range. Raises ValueError when the result would hold
+    more than MAX_POINTS points.
+    """
+    count = check_range(start, end, granularity)
+    periods = [shift_bucket(bucket_start(start, granularity), granularity, i) for i in range(count)]
+
+    # (series, period) -> [income, expenses]; series is TOTAL or a category id
+    sums = defaultdict(lambda: [0, 0])
+    categories = {}
+    for row in grouped_rows(user, start, end, granularity, by_category):
+        # Trunc* on a date column comes back as a date, or a datetime on some backends
+        period = row['period']
+        period = period.date() if hasattr(period, 'date') else period
+        keys = [TOTAL, row['category_id']] if by_category else [TOTAL]
+        for key in keys:
+            cell = sums[key, period]
+            cell[0] += row['income'] or 0
+            cell[1] += row['expenses'] or 0
+        if by_category:
+            categories[row['category_id']] = row['category__name']
+
+    if by_category and count * (len(categories) + 1) > MAX_POINTS:
+        raise ValueError(
+            f"{len(categories)} categories over {count} {granularity} buckets is more than {MAX_POINTS} points"
+        )
+
+    def series(key):
+        return [point(period, *sums.get((key, period), (0, 0))) for period in periods]
+
+    data = {
+        'granularity': granularity,
+        'start_date': start.isoformat(),
+        'end_date': end.isoformat(),
+        'series': series(TOTAL),
+    }
+    if by_category:
+        # Named categories alphabetically, uncategorized last
+        ordered = sorted(categories.items(), key=lambda item: (item[0] is None, item[1] or ''))
+        data['categories'] = [
+            {'category': pk, 'category_name': name, 'series': series(pk)}
+            for pk, name in ordered
+        ]
+    return data
@@ -0,0 +1,19 @@
+from django.utils import timezone
+from accounts.asynchronous import async_api_view, json_response
+from accounts.cache import acached
+from .dashboard import abuild_dashboard
+
+
+@async_api_view(daily=True)
+async def dashboard(request, user):
+    """
+    Async version of TransactionViewSet.dashboard, served in ASGI mode
+    """
+    today = timezone.now().date()
+    dashboard_data, hit = await acached(
+        user, 'dashboard', [today],
+        lambda: abuild_dashboard(user, today),
+        version=request.data_version.version
+    )
+    
+    return json_response(dashboard_data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
@@ -0,0 +1,155 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Count, F
+from .models import Transaction, Balance
+
+# SQLite hands back aggregated decimals unquantized
+CENT = Decimal('0.01')
+# Above this many users/types a batch of deltas is applied with bulk queries
+BULK_THRESHOLD = 50
+
+
+def apply_delta(user_id, transaction_type, amount, count):
+    """
+    Add amount/count to a user's running income or expense total, creating
+    the row on first use and dropping it once it no longer covers any
+    transaction
+    """
+    rows = Balance.objects.filter(user_id=user_id, transaction_type=transaction_type)
+
+    with transaction.atomic(savepoint=False):
+        if rows.update(total=F('total') + amount, count=F('count') + count):
+            if count < 0:
+                rows.filter(count__lte=0).delete()
+            return
+        if count <= 0:
+            # Nothing to take away from, e.g. while a user is being deleted
+            return
+        try:
+            with transaction.atomic():
+                Balance.objects.create(
+                    user_id=user_id,
+                    transaction_type=transaction_type,
+                    total=amount,
+                    count=count
+                )
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def apply_deltas_in_bulk(deltas):
+    """
+    apply_delta for many (user, type) pairs at once: the affected rows are
+    locked and read with one query, then updated, dropped and created in bulk
+    """
+    with transaction.atomic(savepoint=False):
+        rows = Balance.objects.select_for_update().filter(user_id__in={user_id for user_id, _ in deltas})
+        existing = {(row.user_id, row.transaction_type): row for row in rows}
+
+        changed, emptied, created = [], [], []
+        for (user_id, transaction_type), (amount, count) in deltas.items():
+            row = existing.get((user_id, transaction_type))
+            if row is None:
+                if count > 0:
+                    created.append(Balance(user_id=user_id, transaction_type=transaction_type, total=amount, count=count))
+                continue
+            row.total += amount
+            row.count += count
+            (changed if row.count > 0 else emptied).append(row)
+
+        Balance.objects.bulk_update(changed, ['total', 'count'])
+        Balance.objects.filter(pk__in=[row.pk for row in emptied]).delete()
+        try:
+            with transaction.atomic():
+                Balance.objects.bulk_create(created)
+        except IntegrityError:
+            # Another writer created some of the rows first
+            for row in created:
+                apply_delta(row.user_id, row.transaction_type, row.total, row.count)
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Fold rollup deltas, keyed by (user, category, type, year, month), into
+    one update per affected user and transaction type
+    """
+    balances = defaultdict(lambda: [0, 0])
+    for (user_id, category_id, transaction_type, year, month), (amount, count) in deltas.items():
+        delta = balances[user_id, transaction_type]
+        delta[0] += amount
+        delta[1] += count
+
+    balances = {key: delta for key, delta in balances.items() if delta[0] or delta[1]}
+    if len(balances) > BULK_THRESHOLD:
+        apply_deltas_in_bulk(balances)
+        return
+    for (user_id, transaction_type), (amount, count) in balances.items():
+        apply_delta(user_id, transaction_type, amount, count)
+
+
+def totals(user):
+    """
+    A user's (total income, total expenses), 0 for a type without transactions
+    """
+    rows = dict(Balance.objects.filter(user=user).values_list('transaction_type', 'total'))
+    return rows.get('income', 0), rows.get('expense', 0)
+
+
+def stored(user=None):
+    balances = Balance.objects.all()
+    if user is not None:
+        balances = balances.filter(user=user)
+    return {
+        (row['user_id'], row['transaction_type']): (row['total'], row['count'])
+        for row in balances.values('user_id', 'transaction_type', 'total', 'count')
+    }
+
+
+def computed(user=None):
+    transactions = Transaction.objects.all()
+    if user is not None:
+        transactions = transactions.filter(user=user)
+    grouped = transactions.values('user_id', 'transaction_type').annotate(
+        total=Sum('amount'),
+        count=Count('id')
+    ).order_by()
+    return {
+        (row['user_id'], row['transaction_type']): (row['total'].quantize(CENT), row['count'])
+        for row in grouped
+    }
+
+
+def verify(user=None):
+    """
+    Compare the stored balances with totals recomputed from the raw
+    transactions. Returns (user id, type, stored, expected) for every
+    mismatch, where a missing side is None.
+    """
+    actual = stored(user)
+    expected = computed(user)
+    mismatches = []
+    for key in sorted(set(actual) | set(expected)):
+        if actual.get(key) != expected.get(key):
+            user_id, transaction_type = key
+            mismatches.append((user_id, transaction_type, actual.get(key), expected.get(key)))
+    return mismatches
+
+
+def rebuild(user=None):
+    """
+    Recompute the balances from the raw transactions for one user or
+    everyone. Returns the number of balance rows written.
+    """
+    balances = Balance.objects.all()
+    if user is not None:
+        balances = balances.filter(user=user)
+
+    with transaction.atomic():
+        balances.delete()
+        created = Balance.objects.bulk_create(
+            Balance(user_id=user_id, transaction_type=transaction_type, total=total, count=count)
+            for (user_id, transaction_type), (total, count) in computed(user).items()
+        )
+    return len(created)
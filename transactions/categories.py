@@ -0,0 +1,46 @@
+from rest_framework import serializers
+from .models import Category
+
+
+def load_categories(user):
+    """
+    id -> name of a user's categories, in one query
+    """
+    return dict(Category.objects.filter(user=user).values_list('id', 'name'))
+
+
+def request_categories(request):
+    """
+    The requesting user's categories, loaded at most once per request and
+    shared by every serializer and filter validating category ids in it
+    """
+    if not hasattr(request, '_categories'):
+        request._categories = load_categories(request.user)
+    return request._categories
+
+
+class UserCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category pk that must belong to the requesting user. Values are checked
+    against request_categories() instead of a query per value, and ids of
+    other users' categories are rejected as not existing.
+    """
+    def get_queryset(self):
+        return Category.objects.filter(user=self.context['request'].user)
+
+    def to_internal_value(self, data):
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        request = self.context['request']
+        names = request_categories(request)
+        if pk not in names:
+            self.fail('does_not_exist', pk_value=data)
+        # Enough of the row for the write and the category_name in the response
+        return Category.from_db(
+            Category.objects.db, ['id', 'name', 'user_id'], [pk, names[pk], request.user.pk]
+        )
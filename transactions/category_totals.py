@@ -0,0 +1,70 @@
+from collections import defaultdict
+from django.db.models import (
+    Case, Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce
+from .models import Category, Transaction
+
+INCOME = Q(transaction_type='income')
+EXPENSE = Q(transaction_type='expense')
+TOTAL_FIELD = Category._meta.get_field('total_income')
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Fold rollup deltas, keyed by (user, category, type, year, month), into
+    the transaction count and income/expense totals of their categories,
+    with a single UPDATE for all of them
+    """
+    counters = defaultdict(lambda: [0, 0, 0])
+    for (user_id, category_id, transaction_type, year, month), (amount, count) in deltas.items():
+        if category_id is None:
+            continue
+        delta = counters[category_id]
+        delta[0] += count
+        delta[1 if transaction_type == 'income' else 2] += amount
+
+    counters = {pk: delta for pk, delta in counters.items() if any(delta)}
+    if not counters:
+        return
+
+    def increment(field, index, output_field):
+        return F(field) + Case(
+            *[When(pk=pk, then=Value(delta[index])) for pk, delta in counters.items()],
+            default=Value(0),
+            output_field=output_field
+        )
+
+    Category.objects.filter(pk__in=counters).update(
+        transaction_count=increment('transaction_count', 0, IntegerField()),
+        total_income=increment('total_income', 1, TOTAL_FIELD),
+        total_expenses=increment('total_expenses', 2, TOTAL_FIELD),
+    )
+
+
+def aggregate(expression, output_field):
+    """
+    Correlated subquery aggregating the transactions of the outer category
+    """
+    transactions = Transaction.objects.filter(category=OuterRef('pk')).order_by().values('category')
+    return Coalesce(
+        Subquery(transactions.annotate(value=expression).values('value'), output_field=output_field),
+        Value(0),
+        output_field=output_field
+    )
+
+
+def rebuild(user=None):
+    """
+    Recompute the counters of every category (of one user or everyone)
+    from the raw transactions in one UPDATE. Returns the number of
+    categories written.
+    """
+    categories = Category.objects.all()
+    if user is not None:
+        categories = categories.filter(user=user)
+    return categories.update(
+        transaction_count=aggregate(Count('id'), IntegerField()),
+        total_income=aggregate(Sum('amount', filter=INCOME), TOTAL_FIELD),
+        total_expenses=aggregate(Sum('amount', filter=EXPENSE), TOTAL_FIELD),
+    )
@@ -0,0 +1,123 @@
+from django.db.models import Sum, Q
+from .models import Transaction, MonthlyRollup
+from .rollups import period_range
+from . import balances
+from .serializers import TransactionListSerializer
+from accounts.asynchronous import concurrently
+
+INCOME = Q(transaction_type='income')
+EXPENSE = Q(transaction_type='expense')
+
+
+def add_months(year, month, delta):
+    """
+    Shift a (year, month) pair by delta months
+    """
+    index = year * 12 + (month - 1) + delta
+    return index // 12, index % 12 + 1
+
+
+def month_window(today, months=6):
+    """
+    Return the (year, month) pairs of the last `months` months ending with
+    today's month, oldest first
+    """
+    return [add_months(today.year, today.month, -i) for i in range(months - 1, -1, -1)]
+
+
+def category_totals(rollups):
+    """
+    Per-category income and expense breakdowns from a single grouped query
+    """
+    rows = rollups.values('category__name').annotate(
+        income=Sum('total', filter=INCOME),
+        expenses=Sum('total', filter=EXPENSE),
+    )
+
+    income_by_category = {}
+    expense_by_category = {}
+    for row in rows:
+        if row['category__name'] and row['income'] is not None:
+            income_by_category[row['category__name']] = row['income']
+        if row['category__name'] and row['expenses'] is not None:
+            expense_by_category[row['category__name']] = row['expenses']
+
+    return income_by_category, expense_by_category
+
+
+def monthly_summary(rollups, today, months=6):
+    """
+    Income/expense series for the last `months` months from a single query
+    over the monthly rollups
+    """
+    periods = month_window(today, months)
+    rows = rollups.filter(period_range(periods[0], periods[-1])).values(
+        'year', 'month'
+    ).annotate(
+        income=Sum('total', filter=INCOME),
+        expenses=Sum('total', filter=EXPENSE),
+    ).order_by()
+    by_period = {(row['year'], row['month']): row for row in rows}
+
+    summary = []
+    for year, month in periods:
+        row = by_period.get((year, month), {})
+        income = row.get('income') or 0
+        expenses = row.get('expenses') or 0
+        summary.append({
+            'month': month,
+            'year': year,
+            'income': income,
+            'expenses': expenses,
+            'net': income - expenses
+        })
+    return summary
+
+
+def recent_transactions(user):
+    return TransactionListSerializer(
+        Transaction.objects.filter(user=user).select_related('category').order_by('-date')[:5],
+        many=True
+    ).data
+
+
+def dashboard_data(totals, breakdowns, summary, recent):
+    total_income, total_expenses = totals
+    income_by_category, expense_by_category = breakdowns
+    return {
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'net_balance': total_income - total_expenses,
+        'expense_by_category': expense_by_category,
+        'income_by_category': income_by_category,
+        'monthly_summary': summary,
+        'recent_transactions': recent,
+        'budget_status': []  # Will be populated by budget views
+    }
+
+
+def build_dashboard(user, today):
+    """
+    Compute the DashboardSummarySerializer payload for a user
+    """
+    rollups = MonthlyRollup.objects.filter(user=user)
+    return dashboard_data(
+        balances.totals(user),
+        category_totals(rollups),
+        monthly_summary(rollups, today),
+        recent_transactions(user)
+    )
+
+
+async def abuild_dashboard(user, today):
+    """
+    build_dashboard for async views: the four independent queries run
+    concurrently
+    """
+    rollups = MonthlyRollup.objects.filter(user=user)
+    return dashboard_data(*await concurrently(
+        lambda: balances.totals(user),
+        lambda: category_totals(rollups),
+        lambda: monthly_summary(rollups, today),
+        lambda: recent_transactions(user),
+    ))
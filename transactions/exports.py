@@ -0,0 +1,50 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = [
+    'id', 'amount', 'description', 'category', 'category_name',
+    'transaction_type', 'date'
+]
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """
+    File-like object that hands back what is written so csv.writer can
+    produce lines for a streaming response
+    """
+    def write(self, value):
+        return value
+
+
+def export_rows(queryset, chunk_size=CHUNK_SIZE):
+    """
+    Stream transactions as plain dicts in the TransactionListSerializer
+    field order, without instantiating models
+    """
+    rows = queryset.values(
+        'id', 'amount', 'description', 'category', 'category__name',
+        'transaction_type', 'date'
+    ).iterator(chunk_size=chunk_size)
+    for row in rows:
+        row['category_name'] = row.pop('category__name')
+        yield {field: row[field] for field in EXPORT_FIELDS}
+
+
+def stream_csv(queryset):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in export_rows(queryset):
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def stream_ndjson(queryset):
+    for row in export_rows(queryset):
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
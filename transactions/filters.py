@@ -1,28 +1,47 @@
 import django_filters
-from django.db.models import Q
-from .models import Transaction, Category
+from rest_framework import filters
+from .models import Transaction
+from .categories import request_categories
+from .search import search_transactions, tokens
 
 class TransactionFilter(django_filters.FilterSet):
     min_amount = django_filters.NumberFilter(field_name="amount", lookup_expr='gte')
     max_amount = django_filters.NumberFilter(field_name="amount", lookup_expr='lte')
     start_date = django_filters.DateFilter(field_name="date", lookup_expr='gte')
     end_date = django_filters.DateFilter(field_name="date", lookup_expr='lte')
-    category = django_filters.ModelMultipleChoiceFilter(
-        queryset=Category.objects.all(),
-        field_name="category"
-    )
+    # Choices are the requesting user's categories, see __init__
+    category = django_filters.MultipleChoiceFilter(field_name="category")
     transaction_type = django_filters.ChoiceFilter(choices=Transaction.TRANSACTION_TYPES)
     
     # Custom filter for searching across multiple fields
     search = django_filters.CharFilter(method='filter_search')
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.request
+        if request is not None:
+            # Evaluated only when a ?category= value is validated
+            self.filters['category'].extra['choices'] = lambda: [
+                (str(pk), name) for pk, name in request_categories(request).items()
+            ]
+    
     def filter_search(self, queryset, name, value):
-        return queryset.filter(
-            Q(description__icontains=value) | 
-            Q(category__name__icontains=value)
-        )
+        user_id = self.request.user.pk if self.request is not None else None
+        return search_transactions(queryset, value, user_id)
     
     class Meta:
         model = Transaction
         fields = ['category', 'transaction_type', 'date', 'min_amount', 'max_amount', 
-                 'start_date', 'end_date', 'search']
\ No newline at end of file
+                 'start_date', 'end_date', 'search']
+
+class SearchRankOrderingFilter(filters.OrderingFilter):
+    """
+    Keeps the relevance order of ?search= results unless the client asks for
+    an explicit ordering (or pages with a cursor, which needs real fields)
+    """
+    def filter_queryset(self, request, queryset, view):
+        if (tokens(request.query_params.get('search', '')) and
+                not request.query_params.get(self.ordering_param) and
+                'cursor' not in request.query_params):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,88 @@
+import codecs
+import csv
+from django.db import transaction
+from accounts.cache import next_version
+from .models import Transaction
+from .categories import load_categories
+from .serializers import TransactionImportSerializer
+from . import rollups
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+INVALID_CATEGORY = 'Invalid pk "{pk_value}" - object does not exist.'
+# category may be left out, the transactions are then uncategorized
+CSV_COLUMNS = ['amount', 'description', 'transaction_type', 'date']
+
+
+def iter_csv(lines):
+    """
+    Lazily turn CSV lines (bytes) into row dicts, so uploads are validated
+    and inserted while they are still being read. Raises ValueError with the
+    message for a 400 response when the file is not UTF-8 CSV or lacks a
+    column, which can happen after earlier rows were read.
+    """
+    reader = csv.DictReader(codecs.iterdecode(lines, 'utf-8-sig'))
+    try:
+        missing = [column for column in CSV_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV is missing the column(s): {', '.join(missing)}")
+        for row in reader:
+            if not row.get('category'):
+                row['category'] = None
+            yield row
+    except UnicodeDecodeError as error:
+        raise ValueError(f"CSV must be UTF-8 encoded, line {reader.line_num + 1} is not")
+    except csv.Error as error:
+        raise ValueError(f"Invalid CSV on line {reader.line_num}: {error}")
+
+
+def save_batch(batch):
+    Transaction.objects.bulk_create(batch)
+    rollups.record(batch)
+    return len(batch)
+
+
+def import_transactions(user, rows, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Validate rows and insert the valid ones with bulk_create in batches of
+    batch_size inside one transaction. Invalid rows are reported by their
+    1-based position and skipped instead of failing the whole import.
+    Returns (created, errors). A ValueError from reading rows (see iter_csv)
+    rolls the whole import back.
+    """
+    owned_categories = load_categories(user)
+    created = 0
+    errors = []
+    batch = []
+
+    with transaction.atomic():
+        version = next_version(user.pk)
+        for number, row in enumerate(rows, start=1):
+            serializer = TransactionImportSerializer(data=row)
+            if not serializer.is_valid():
+                errors.append({'row': number, 'errors': serializer.errors})
+                continue
+
+            data = serializer.validated_data
+            category = data.get('category')
+            if category is not None and category not in owned_categories:
+                errors.append({'row': number, 'errors': {'category': [INVALID_CATEGORY.format(pk_value=category)]}})
+                continue
+
+            batch.append(Transaction(
+                user=user,
+                amount=data['amount'],
+                description=data['description'],
+                category_id=category,
+                transaction_type=data['transaction_type'],
+                date=data['date'],
+                version=version
+            ))
+            if len(batch) >= batch_size:
+                created += save_batch(batch)
+                batch = []
+
+        if batch:
+            created += save_batch(batch)
+
+    return created, errors
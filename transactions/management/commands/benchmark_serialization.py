@@ -0,0 +1,54 @@
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from transactions.models import Transaction
+from transactions.pagination import CustomPageNumberPagination
+from transactions.serializers import TransactionListSerializer, LIST_VALUES, list_representation
+from finance_tracker_project.instrumentation import QueryRecorder
+
+class Command(BaseCommand):
+    help = 'Compares the serializer and the values() fast path for transaction list pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default='loaduser0', help='User whose transactions are listed (see generate_data)')
+        parser.add_argument('--page-sizes', type=int, nargs='*', default=[10, 25, 50, CustomPageNumberPagination.max_page_size])
+        parser.add_argument('--repeat', type=int, default=50, help='Runs per page size, the median is reported')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'User "{options["username"]}" does not exist, run generate_data first')
+
+        queryset = Transaction.objects.filter(user=user).order_by('-date', '-id')
+        paths = {
+            'serializer': lambda size: TransactionListSerializer(queryset[:size], many=True).data,
+            'serializer + select_related': lambda size: TransactionListSerializer(
+                queryset.select_related('category')[:size], many=True
+            ).data,
+            'values()': lambda size: list_representation(queryset.values(*LIST_VALUES)[:size]),
+        }
+        renderer = JSONRenderer()
+
+        for size in options['page_sizes']:
+            self.stdout.write(self.style.MIGRATE_HEADING(f'page size {size}'))
+            outputs = set()
+            for name, build in paths.items():
+                outputs.add(renderer.render(build(size)))
+                queries = QueryRecorder(keep=0)
+                with connection.execute_wrapper(queries):
+                    build(size)
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    renderer.render(build(size))
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(
+                    f'  {name:<28} {statistics.median(timings):>8.3f} ms  {queries.count:>4} queries'
+                )
+            if len(outputs) != 1:
+                raise CommandError(f'Outputs differ at page size {size}')
+            self.stdout.write(self.style.SUCCESS('  identical JSON'))
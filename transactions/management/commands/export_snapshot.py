@@ -0,0 +1,41 @@
+import os
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from transactions.models import Transaction
+from transactions import snapshots
+
+class Command(BaseCommand):
+    help = (
+        'Exports transactions as a columnar snapshot: one memory-mappable .npy file per column '
+        'plus a manifest.json, written to a directory or packed into an .npz archive'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Directory to write, or a path ending in .npz for a single archive')
+        parser.add_argument('--user', help='Only export the transactions of this username')
+        parser.add_argument('--chunk-size', type=int, default=snapshots.CHUNK_SIZE, help='Rows read and written at a time')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        transactions = Transaction.objects.all()
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+            transactions = transactions.filter(user=user)
+
+        if output.endswith('.npz'):
+            with tempfile.TemporaryDirectory() as directory:
+                manifest = snapshots.write_snapshot(transactions, directory, chunk_size=options['chunk_size'])
+                snapshots.bundle(directory, output)
+        else:
+            if os.path.isdir(output) and os.listdir(output):
+                raise CommandError(f'Directory "{output}" is not empty')
+            os.makedirs(output, exist_ok=True)
+            manifest = snapshots.write_snapshot(transactions, output, chunk_size=options['chunk_size'])
+
+        scope = f'user "{user.username}"' if user else 'all users'
+        self.stdout.write(self.style.SUCCESS(f'Exported {manifest["rows"]} transactions for {scope} to {output}'))
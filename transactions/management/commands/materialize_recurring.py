@@ -0,0 +1,37 @@
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.utils import timezone
+from transactions import recurring
+
+class Command(BaseCommand):
+    help = (
+        'Creates the transactions of every recurring rule occurrence due up to a date (default today), '
+        'catching up on missed runs; safe to run repeatedly, e.g. from a daily cron job'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--through', help='Materialize occurrences up to this date, YYYY-MM-DD (default: today)')
+        parser.add_argument('--user', help='Only materialize the rules of this username')
+        parser.add_argument('--batch-size', type=int, default=recurring.BATCH_SIZE, help='Rules per database transaction')
+
+    def handle(self, *args, **options):
+        through = timezone.now().date()
+        if options['through']:
+            try:
+                through = datetime.strptime(options['through'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Invalid --through date, use YYYY-MM-DD')
+
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+
+        rules, created = recurring.materialize(through, user=user, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} transactions from {rules} due recurring rules through {through}'
+        ))
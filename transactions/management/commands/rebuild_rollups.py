@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from transactions import rollups
+
+class Command(BaseCommand):
+    help = 'Rebuilds the monthly transaction rollups from the raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only rebuild the rollups of this username')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+        
+        written = rollups.rebuild(user)
+        
+        scope = f'user "{user.username}"' if user else 'all users'
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} rollup rows for {scope}'))
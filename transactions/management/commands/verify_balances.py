@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from transactions import balances
+
+class Command(BaseCommand):
+    help = 'Checks the stored per-user income/expense balances against the raw transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only check the balances of this username')
+        parser.add_argument('--repair', action='store_true', help='Rebuild the balances when a mismatch is found')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User "{options["user"]}" does not exist')
+
+        mismatches = balances.verify(user)
+        scope = f'user "{user.username}"' if user else 'all users'
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS(f'Balances of {scope} are consistent'))
+            return
+
+        for user_id, transaction_type, stored, expected in mismatches:
+            self.stdout.write(self.style.WARNING(
+                f'user {user_id} {transaction_type}: stored {self.describe(stored)}, expected {self.describe(expected)}'
+            ))
+
+        if not options['repair']:
+            raise CommandError(f'{len(mismatches)} balance(s) out of sync, run with --repair to rebuild them')
+
+        written = balances.rebuild(user)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} balance rows for {scope}'))
+
+    def describe(self, balance):
+        if balance is None:
+            return 'nothing'
+        total, count = balance
+        return f'{total} over {count} transactions'
@@ -0,0 +1,128 @@
+from django.db import migrations
+
+# Kept in sync by triggers, so bulk inserts and queryset updates are covered too
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE transaction_search USING fts5(
+        description, category_name, user_id UNINDEXED, tokenize = 'unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER transaction_search_insert AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO transaction_search (rowid, description, category_name, user_id)
+        VALUES (
+            new.id, new.description,
+            (SELECT name FROM transactions_category WHERE id = new.category_id),
+            new.user_id
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_update
+    AFTER UPDATE OF description, category_id ON transactions_transaction BEGIN
+        UPDATE transaction_search SET
+            description = new.description,
+            category_name = (SELECT name FROM transactions_category WHERE id = new.category_id)
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_delete AFTER DELETE ON transactions_transaction BEGIN
+        DELETE FROM transaction_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_category_rename
+    AFTER UPDATE OF name ON transactions_category BEGIN
+        UPDATE transaction_search SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM transactions_transaction WHERE category_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO transaction_search (rowid, description, category_name, user_id)
+    SELECT t.id, t.description, c.name, t.user_id
+    FROM transactions_transaction t LEFT JOIN transactions_category c ON c.id = t.category_id
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS transaction_search_category_rename',
+    'DROP TRIGGER IF EXISTS transaction_search_delete',
+    'DROP TRIGGER IF EXISTS transaction_search_update',
+    'DROP TRIGGER IF EXISTS transaction_search_insert',
+    'DROP TABLE IF EXISTS transaction_search',
+]
+
+POSTGRESQL_FORWARD = [
+    'ALTER TABLE transactions_transaction ADD COLUMN search_vector tsvector',
+    """
+    CREATE FUNCTION transaction_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := to_tsvector('simple',
+            coalesce(NEW.description, '') || ' ' ||
+            coalesce((SELECT name FROM transactions_category WHERE id = NEW.category_id), '')
+        );
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER transaction_search_vector
+    BEFORE INSERT OR UPDATE OF description, category_id ON transactions_transaction
+    FOR EACH ROW EXECUTE FUNCTION transaction_search_vector()
+    """,
+    """
+    CREATE FUNCTION transaction_search_category_rename() RETURNS trigger AS $$
+    BEGIN
+        UPDATE transactions_transaction SET category_id = category_id WHERE category_id = NEW.id;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER transaction_search_category_rename
+    AFTER UPDATE OF name ON transactions_category
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION transaction_search_category_rename()
+    """,
+    'UPDATE transactions_transaction SET category_id = category_id',
+    """
+    CREATE INDEX transaction_search_vector_idx
+    ON transactions_transaction USING GIN (search_vector)
+    """,
+]
+
+POSTGRESQL_BACKWARD = [
+    'DROP TRIGGER IF EXISTS transaction_search_category_rename ON transactions_category',
+    'DROP FUNCTION IF EXISTS transaction_search_category_rename()',
+    'DROP TRIGGER IF EXISTS transaction_search_vector ON transactions_transaction',
+    'DROP FUNCTION IF EXISTS transaction_search_vector()',
+    'ALTER TABLE transactions_transaction DROP COLUMN IF EXISTS search_vector',
+]
+
+STATEMENTS = {
+    'sqlite': (SQLITE_FORWARD, SQLITE_BACKWARD),
+    'postgresql': (POSTGRESQL_FORWARD, POSTGRESQL_BACKWARD),
+}
+
+
+def run(direction):
+    def operation(apps, schema_editor):
+        # Other databases keep the icontains fallback in transactions.search
+        statements = STATEMENTS.get(schema_editor.connection.vendor)
+        if statements:
+            for statement in statements[direction]:
+                schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0006_transaction_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(0), run(1)),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 13:12
+
+import importlib
+from django.conf import settings
+from django.db import migrations, models
+
+# SQLite adds the column by rebuilding transactions_category, which fails
+# while the full-text search triggers refer to the table; drop them meanwhile
+search = importlib.import_module('transactions.migrations.0007_transaction_search')
+CREATE_TRIGGERS = [statement for statement in search.SQLITE_FORWARD if 'CREATE TRIGGER' in statement]
+DROP_TRIGGERS = [statement for statement in search.SQLITE_BACKWARD if 'DROP TRIGGER' in statement]
+
+
+def on_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in statements:
+                schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0009_recurringtransaction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(on_sqlite(DROP_TRIGGERS), on_sqlite(CREATE_TRIGGERS)),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='category_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='txn_user_updated_idx'),
+        ),
+        migrations.RunPython(on_sqlite(CREATE_TRIGGERS), on_sqlite(DROP_TRIGGERS)),
+    ]
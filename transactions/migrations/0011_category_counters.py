@@ -0,0 +1,57 @@
+# Generated by Django 5.2 on 2026-10-18 15:40
+
+import importlib
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+# Same full-text search trigger dance as 0010 around the table rebuild
+sync = importlib.import_module('transactions.migrations.0010_sync_updated_at')
+
+
+def populate_counters(apps, schema_editor):
+    Category = apps.get_model('transactions', 'Category')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    transactions = Transaction.objects.filter(category=OuterRef('pk')).order_by().values('category')
+    total_field = Category._meta.get_field('total_income')
+
+    def aggregate(expression, output_field):
+        return Coalesce(
+            Subquery(transactions.annotate(value=expression).values('value'), output_field=output_field),
+            Value(0),
+            output_field=output_field
+        )
+
+    Category.objects.update(
+        transaction_count=aggregate(Count('id'), models.IntegerField()),
+        total_income=aggregate(Sum('amount', filter=Q(transaction_type='income')), total_field),
+        total_expenses=aggregate(Sum('amount', filter=Q(transaction_type='expense')), total_field),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0010_sync_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(sync.on_sqlite(sync.DROP_TRIGGERS), sync.on_sqlite(sync.CREATE_TRIGGERS)),
+        migrations.AddField(
+            model_name='category',
+            name='transaction_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='total_income',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='total_expenses',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.RunPython(sync.on_sqlite(sync.CREATE_TRIGGERS), sync.on_sqlite(sync.DROP_TRIGGERS)),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
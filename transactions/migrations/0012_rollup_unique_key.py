@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 13:56
+
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def merge_duplicate_rollups(apps, schema_editor):
+    # Uncategorized rows created concurrently may exist twice for a month
+    MonthlyRollup = apps.get_model('transactions', 'MonthlyRollup')
+    key = ['user', 'category', 'transaction_type', 'year', 'month']
+    duplicates = MonthlyRollup.objects.filter(category__isnull=True).values(*key).annotate(
+        rows=Count('id'), merged_total=Sum('total'), merged_count=Sum('count')
+    ).filter(rows__gt=1).order_by()
+    for duplicate in duplicates:
+        rows = MonthlyRollup.objects.filter(**{field: duplicate[field] for field in key}).order_by('id')
+        keep = rows.first()
+        rows.exclude(pk=keep.pk).delete()
+        keep.total = duplicate['merged_total']
+        keep.count = duplicate['merged_count']
+        keep.save(update_fields=['total', 'count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0011_category_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_rollups, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='monthlyrollup',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='monthlyrollup',
+            index=models.Index(fields=['user', 'category', 'transaction_type', 'year', 'month'], name='rollup_key_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(models.F('user'), django.db.models.functions.comparison.Coalesce(models.F('category'), models.Value(0)), models.F('transaction_type'), models.F('year'), models.F('month'), name='rollup_unique_key'),
+        ),
+    ]
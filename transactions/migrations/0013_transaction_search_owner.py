@@ -0,0 +1,74 @@
+import importlib
+from django.db import migrations
+
+# The FTS5 table gets an indexed owner column holding a "u<user id>" token,
+# so a search only walks the requesting user's rows instead of matching
+# across everyone's and filtering on user_id afterwards
+search = importlib.import_module('transactions.migrations.0007_transaction_search')
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE transaction_search USING fts5(
+        description, category_name, owner, tokenize = 'unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER transaction_search_insert AFTER INSERT ON transactions_transaction BEGIN
+        INSERT INTO transaction_search (rowid, description, category_name, owner)
+        VALUES (
+            new.id, new.description,
+            (SELECT name FROM transactions_category WHERE id = new.category_id),
+            'u' || new.user_id
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_update
+    AFTER UPDATE OF description, category_id ON transactions_transaction BEGIN
+        UPDATE transaction_search SET
+            description = new.description,
+            category_name = (SELECT name FROM transactions_category WHERE id = new.category_id)
+        WHERE rowid = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_delete AFTER DELETE ON transactions_transaction BEGIN
+        DELETE FROM transaction_search WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER transaction_search_category_rename
+    AFTER UPDATE OF name ON transactions_category BEGIN
+        UPDATE transaction_search SET category_name = new.name
+        WHERE rowid IN (SELECT id FROM transactions_transaction WHERE category_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO transaction_search (rowid, description, category_name, owner)
+    SELECT t.id, t.description, c.name, 'u' || t.user_id
+    FROM transactions_transaction t LEFT JOIN transactions_category c ON c.id = t.category_id
+    """,
+]
+CREATE_TRIGGERS = [statement for statement in SQLITE_FORWARD if 'CREATE TRIGGER' in statement]
+DROP_TRIGGERS = [statement for statement in search.SQLITE_BACKWARD if 'DROP TRIGGER' in statement]
+
+
+def rebuild(forward):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor == 'sqlite':
+            for statement in search.SQLITE_BACKWARD:
+                schema_editor.execute(statement)
+            for statement in (SQLITE_FORWARD if forward else search.SQLITE_FORWARD):
+                schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0012_rollup_unique_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild(True), rebuild(False)),
+    ]
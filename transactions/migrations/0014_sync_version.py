@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-18 14:05
+
+import importlib
+from django.conf import settings
+from django.db import migrations, models
+
+# Both tables are rebuilt on SQLite; same trigger dance as 0010, with the
+# triggers as 0013 left them
+sync = importlib.import_module('transactions.migrations.0010_sync_updated_at')
+search = importlib.import_module('transactions.migrations.0013_transaction_search_owner')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0013_transaction_search_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(sync.on_sqlite(search.DROP_TRIGGERS), sync.on_sqlite(search.CREATE_TRIGGERS)),
+        migrations.RemoveIndex(
+            model_name='category',
+            name='category_user_updated_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='transaction',
+            name='txn_user_updated_idx',
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transaction',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['user', 'version', 'id'], name='category_user_version_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['user', 'version', 'id'], name='txn_user_version_idx'),
+        ),
+        migrations.RunPython(sync.on_sqlite(search.CREATE_TRIGGERS), sync.on_sqlite(search.DROP_TRIGGERS)),
+    ]
@@ -1,16 +1,48 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.core.validators import MinValueValidator
 from django.contrib.auth.models import User
+from accounts.cache import next_version
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
     description = models.CharField(max_length=255)
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='categories')
+    updated_at = models.DateTimeField(auto_now=True)
+    # Data version of the write that last changed it, for delta sync
+    version = models.PositiveBigIntegerField(default=0)
+    # Maintained from the transaction writes (see transactions/category_totals.py)
+    transaction_count = models.IntegerField(default=0)
+    total_income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_expenses = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    COUNTERS = ('transaction_count', 'total_income', 'total_expenses')
     
     def __str__(self):
         return self.name
     
+    def save(self, *args, **kwargs):
+        # The counters only change through F() updates; saving an instance
+        # loaded earlier must not write its stale copies back
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in deferred and field.name not in self.COUNTERS
+            ]
+        with transaction.atomic(using=kwargs.get('using')):
+            self.version = next_version(self.user_id)
+            if kwargs.get('update_fields'):
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+            super().save(*args, **kwargs)
+    
     class Meta:
         verbose_name_plural = "Categories"
+        indexes = [
+            # Delta sync
+            models.Index(fields=['user', 'version', 'id'], name='category_user_version_idx'),
+        ]
 
 class Transaction(models.Model):
     TRANSACTION_TYPES = (
@@ -26,6 +58,107 @@ class Transaction(models.Model):
     date = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Data version of the write that last changed it, for delta sync
+    version = models.PositiveBigIntegerField(default=0)
     
     def __str__(self):
-        return f"{self.description} - {self.amount}"
\ No newline at end of file
+        return f"{self.description} - {self.amount}"
+    
+    def save(self, *args, **kwargs):
+        # post_save is sent after Django's own save has finished; keep the
+        # rollups, balances, category counters and budget alerts its
+        # receivers write in the same database transaction as the row
+        with transaction.atomic(using=kwargs.get('using')):
+            self.version = next_version(self.user_id)
+            if kwargs.get('update_fields'):
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+            super().save(*args, **kwargs)
+    
+    class Meta:
+        indexes = [
+            # Default list ordering and date range filters
+            models.Index(fields=['user', '-date'], name='txn_user_date_idx'),
+            # Dashboard/budget aggregates and transaction_type filters
+            models.Index(fields=['user', 'transaction_type', 'date'], name='txn_user_type_date_idx'),
+            # Category filters and per-category spending
+            models.Index(fields=['user', 'category', 'date'], name='txn_user_category_date_idx'),
+            # Delta sync
+            models.Index(fields=['user', 'version', 'id'], name='txn_user_version_idx'),
+        ]
+
+class RecurringTransaction(models.Model):
+    """
+    Rule for a transaction repeating every `interval` days, weeks or months
+    from start_date. next_date is the first occurrence not materialized yet.
+    """
+    FREQUENCIES = (
+        ('daily', 'Daily'),
+        ('weekly', 'Weekly'),
+        ('monthly', 'Monthly'),
+    )
+    
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='recurring_transactions')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    description = models.CharField(max_length=255)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, related_name='recurring_transactions')
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    frequency = models.CharField(max_length=10, choices=FREQUENCIES)
+    interval = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    next_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.description} - {self.amount} every {self.interval} {self.frequency}"
+    
+    class Meta:
+        indexes = [
+            # Due rules scan of the materialization worker
+            models.Index(fields=['next_date'], name='recurring_next_date_idx'),
+        ]
+
+class MonthlyRollup(models.Model):
+    """
+    Per user/category/type monthly totals maintained from Transaction writes
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_rollups')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, related_name='monthly_rollups')
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    year = models.IntegerField()
+    month = models.IntegerField()  # 1-12
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.transaction_type} {self.month}/{self.year} - {self.total}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'category', 'transaction_type', 'year', 'month'], name='rollup_key_idx'),
+        ]
+        constraints = [
+            # NULLs are distinct in a plain unique index, which would let two
+            # uncategorized rows for the same month be created concurrently
+            models.UniqueConstraint(
+                F('user'), Coalesce(F('category'), Value(0)), F('transaction_type'), F('year'), F('month'),
+                name='rollup_unique_key'
+            ),
+        ]
+
+class Balance(models.Model):
+    """
+    Running all-time income or expense total per user, maintained together
+    with the monthly rollups so the dashboard totals are a single-row read
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='balances')
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.user_id} {self.transaction_type} - {self.total}"
+    
+    class Meta:
+        unique_together = ('user', 'transaction_type')
@@ -1,5 +1,13 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from functools import reduce
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = 10
@@ -16,4 +24,143 @@ class CustomPageNumberPagination(PageNumberPagination):
             'total_pages': self.page.paginator.num_pages,
             'current_page': self.page.number,
             'results': data
-        })
\ No newline at end of file
+        })
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only cursor pagination keyed on the active ordering plus the
+    primary key, so deep pages cost the same as the first one and no
+    OFFSET or COUNT(*) is issued unless the client asks for the count.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    default_ordering = ['-date']
+    invalid_cursor_message = 'Invalid cursor'
+    
+    # Nullable ordering fields are compared through a non-null stand-in
+    null_substitutes = {
+        'category__name': Value(''),
+    }
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        
+        ordering = self.get_ordering(queryset, view)
+        keys = [f'keyset_{index}' for index in range(len(ordering))]
+        queryset = queryset.annotate(**{
+            key: self.get_key_expression(field) for key, (field, descending) in zip(keys, ordering)
+        }).order_by(*[
+            ('-' if descending else '') + key for key, (field, descending) in zip(keys, ordering)
+        ])
+        
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = queryset.count()
+        
+        position = self.decode_cursor(request, len(keys))
+        if position is not None:
+            try:
+                position = [
+                    self.get_key_field(queryset.model, field).to_python(value)
+                    for value, (field, descending) in zip(position, ordering)
+                ]
+                queryset = queryset.filter(self.get_position_filter(keys, ordering, position))
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        self.next_position = None
+        if self.has_next:
+            last = rows[-1]
+            if isinstance(last, dict):
+                self.next_position = [last[key] for key in keys]
+            else:
+                self.next_position = [getattr(last, key) for key in keys]
+        return rows
+    
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+    
+    def get_ordering(self, queryset, view):
+        """
+        The (field, descending) pairs the page is keyed on, ending with the pk
+        """
+        fields = [field for field in queryset.query.order_by if isinstance(field, str)]
+        if not fields:
+            fields = list(getattr(view, 'ordering', None) or self.default_ordering)
+        
+        ordering = [(field.lstrip('-'), field.startswith('-')) for field in fields]
+        if not any(field in ('id', 'pk') for field, descending in ordering):
+            # Ascending pk matches how the (user, -date) index stores ties
+            ordering.append(('id', False))
+        return ordering
+    
+    def get_key_field(self, model, field):
+        """
+        The model field an ordering field refers to, following relations
+        """
+        *relations, name = field.split('__')
+        for relation in relations:
+            model = model._meta.get_field(relation).related_model
+        return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+    
+    def get_key_expression(self, field):
+        if field in self.null_substitutes:
+            return Coalesce(field, self.null_substitutes[field])
+        return F(field)
+    
+    def get_position_filter(self, keys, ordering, position):
+        # (a, b, c) after (x, y, z) expands to
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        conditions = []
+        for index, (key, (field, descending)) in enumerate(zip(keys, ordering)):
+            condition = Q(**{f'{key}__{"lt" if descending else "gt"}': position[index]})
+            for previous in range(index):
+                condition &= Q(**{keys[previous]: position[previous]})
+            conditions.append(condition)
+        return reduce(lambda left, right: left | right, conditions)
+    
+    def decode_cursor(self, request, length):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != length:
+            raise NotFound(self.invalid_cursor_message)
+        return position
+    
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position, default=str).encode('ascii')).decode('ascii')
+    
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+    
+    def get_paginated_response(self, data):
+        response = {
+            'links': {
+                'next': self.get_next_link(),
+                'previous': None
+            },
+        }
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
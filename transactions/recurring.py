@@ -0,0 +1,128 @@
+import calendar
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import F, Q
+from accounts.cache import next_versions
+from .models import RecurringTransaction, Transaction
+from .dashboard import add_months
+from . import rollups
+
+BATCH_SIZE = 500
+# Occurrences held in memory before they are inserted
+CHUNK_SIZE = 5000
+
+
+def occurrence(rule, index):
+    """
+    Date of a rule's index-th occurrence (0 is start_date). Monthly rules
+    keep their day of month, falling back to the last day of shorter months.
+    """
+    step = index * rule.interval
+    if rule.frequency == 'daily':
+        return rule.start_date + timedelta(days=step)
+    if rule.frequency == 'weekly':
+        return rule.start_date + timedelta(weeks=step)
+    year, month = add_months(rule.start_date.year, rule.start_date.month, step)
+    return date(year, month, min(rule.start_date.day, calendar.monthrange(year, month)[1]))
+
+
+def first_index_on_or_after(rule, day):
+    """
+    Index of the first occurrence of a rule falling on or after day
+    """
+    if day <= rule.start_date:
+        return 0
+    if rule.frequency == 'monthly':
+        months = (day.year - rule.start_date.year) * 12 + day.month - rule.start_date.month
+        index = months // rule.interval
+    else:
+        days = (day - rule.start_date).days
+        index = days // (rule.interval * (7 if rule.frequency == 'weekly' else 1))
+    while occurrence(rule, index) < day:
+        index += 1
+    return index
+
+
+def reschedule(rule, day):
+    """
+    Point a rule's next_date at its first occurrence on or after day, e.g.
+    after its schedule changed, without repeating materialized occurrences
+    """
+    rule.next_date = occurrence(rule, first_index_on_or_after(rule, day))
+
+
+def due_rules(through):
+    """
+    Rules with an occurrence on or before through that is not past their
+    end_date
+    """
+    return RecurringTransaction.objects.filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=F('next_date')),
+        next_date__lte=through
+    )
+
+
+def materialize_batch(rule_ids, through):
+    """
+    Create the transactions of every pending occurrence up to through for
+    a batch of rules and move their next_date past them, in one database
+    transaction. Rules are locked and re-checked first, so a concurrent or
+    repeated run can't create an occurrence twice. Occurrences are inserted
+    CHUNK_SIZE at a time, so a rule that is far behind doesn't have to fit
+    in memory. Returns the number of transactions created.
+    """
+    created = 0
+    pending = []
+
+    def flush():
+        Transaction.objects.bulk_create(pending, batch_size=BATCH_SIZE)
+        # bulk_create skips the Transaction signals, do what they would
+        rollups.record(pending)
+        pending.clear()
+
+    with transaction.atomic():
+        rules = list(due_rules(through).filter(pk__in=rule_ids).select_for_update())
+        versions = next_versions(rule.user_id for rule in rules)
+        for rule in rules:
+            last = min(through, rule.end_date) if rule.end_date else through
+            index = first_index_on_or_after(rule, rule.next_date)
+            day = occurrence(rule, index)
+            while day <= last:
+                pending.append(Transaction(
+                    user_id=rule.user_id,
+                    amount=rule.amount,
+                    description=rule.description,
+                    category_id=rule.category_id,
+                    transaction_type=rule.transaction_type,
+                    date=day,
+                    version=versions[rule.user_id]
+                ))
+                created += 1
+                if len(pending) >= CHUNK_SIZE:
+                    flush()
+                index += 1
+                day = occurrence(rule, index)
+            rule.next_date = day
+
+        if pending:
+            flush()
+        RecurringTransaction.objects.bulk_update(rules, ['next_date'], batch_size=BATCH_SIZE)
+    return created
+
+
+def materialize(through, user=None, batch_size=BATCH_SIZE):
+    """
+    Materialize every due occurrence up to and including through for all
+    users (or one), batch_size rules at a time. Runs that were missed are
+    caught up from each rule's next_date, and running it again for the same
+    date creates nothing. Returns (rules, transactions) processed.
+    """
+    rules = due_rules(through)
+    if user is not None:
+        rules = rules.filter(user=user)
+    rule_ids = list(rules.order_by('pk').values_list('pk', flat=True))
+
+    created = 0
+    for start in range(0, len(rule_ids), batch_size):
+        created += materialize_batch(rule_ids[start:start + batch_size], through)
+    return len(rule_ids), created
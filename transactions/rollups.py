@@ -0,0 +1,245 @@
+from collections import defaultdict
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Count, F, Q
+from django.db.models.functions import ExtractYear, ExtractMonth
+from django.dispatch import Signal
+from .models import Transaction, MonthlyRollup
+from . import balances, category_totals
+
+BATCH_SIZE = 1000
+# Above this many keys a batch of deltas is applied with bulk queries
+BULK_THRESHOLD = 50
+
+# Sent with the deltas of every batch applied by apply_deltas(), and with the
+# user (None for everyone) by rebuild(), inside the write's transaction.
+# budgets keeps its alerts up to date from these.
+rollups_changed = Signal()
+rollups_rebuilt = Signal()
+
+
+DATE_FIELD = Transaction._meta.get_field('date')
+AMOUNT_FIELD = Transaction._meta.get_field('amount')
+
+
+def rollup_key(instance):
+    """
+    The (user, category, type, year, month) rollup key a transaction counts towards
+    """
+    # Instances saved with e.g. a date string keep that string after save()
+    day = DATE_FIELD.to_python(instance.date)
+    return (
+        instance.user_id,
+        instance.category_id,
+        instance.transaction_type,
+        day.year,
+        day.month,
+    )
+
+
+def apply_delta(key, amount, count):
+    """
+    Add amount/count to a single rollup row, creating it on first use and
+    dropping it once it no longer covers any transaction
+    """
+    user_id, category_id, transaction_type, year, month = key
+    rows = MonthlyRollup.objects.filter(
+        user_id=user_id,
+        category_id=category_id,
+        transaction_type=transaction_type,
+        year=year,
+        month=month
+    )
+
+    # Usually nested in the write's own transaction; errors propagate, so
+    # no savepoint is needed here, only around the create below
+    with transaction.atomic(savepoint=False):
+        if rows.update(total=F('total') + amount, count=F('count') + count):
+            if count < 0:
+                # Only a removal can empty the row
+                rows.filter(count__lte=0).delete()
+            return
+        if count <= 0:
+            # Nothing to take away from, e.g. while a user is being deleted
+            return
+        try:
+            with transaction.atomic():
+                MonthlyRollup.objects.create(
+                    user_id=user_id,
+                    category_id=category_id,
+                    transaction_type=transaction_type,
+                    year=year,
+                    month=month,
+                    total=amount,
+                    count=count
+                )
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def apply_deltas_in_bulk(deltas):
+    """
+    apply_delta for many keys at once: the affected rows are locked and read
+    with one query, then updated, dropped and created in bulk
+    """
+    keys = [key for key, (amount, count) in deltas.items() if amount or count]
+    with transaction.atomic(savepoint=False):
+        rows = MonthlyRollup.objects.select_for_update().filter(
+            user_id__in={key[0] for key in keys},
+            year__in={key[3] for key in keys}
+        )
+        existing = {
+            (row.user_id, row.category_id, row.transaction_type, row.year, row.month): row
+            for row in rows
+        }
+
+        changed, emptied, created = [], [], []
+        for key in keys:
+            amount, count = deltas[key]
+            row = existing.get(key)
+            if row is None:
+                if count > 0:
+                    user_id, category_id, transaction_type, year, month = key
+                    created.append(MonthlyRollup(
+                        user_id=user_id,
+                        category_id=category_id,
+                        transaction_type=transaction_type,
+                        year=year,
+                        month=month,
+                        total=amount,
+                        count=count
+                    ))
+                continue
+            row.total += amount
+            row.count += count
+            (changed if row.count > 0 else emptied).append(row)
+
+        MonthlyRollup.objects.bulk_update(changed, ['total', 'count'], batch_size=BATCH_SIZE)
+        MonthlyRollup.objects.filter(pk__in=[row.pk for row in emptied]).delete()
+        try:
+            with transaction.atomic():
+                MonthlyRollup.objects.bulk_create(created, batch_size=BATCH_SIZE)
+        except IntegrityError:
+            # Another writer created some of the rows first
+            for row in created:
+                apply_delta(
+                    (row.user_id, row.category_id, row.transaction_type, row.year, row.month),
+                    row.total,
+                    row.count
+                )
+
+
+def collect(deltas, transactions, sign):
+    for instance in transactions:
+        delta = deltas[rollup_key(instance)]
+        delta[0] += sign * AMOUNT_FIELD.to_python(instance.amount)
+        delta[1] += sign
+
+
+def apply_deltas(deltas):
+    if len(deltas) > BULK_THRESHOLD:
+        apply_deltas_in_bulk(deltas)
+    else:
+        for key, (amount, count) in deltas.items():
+            if amount or count:
+                apply_delta(key, amount, count)
+    # Every write path goes through here, so the all-time balances, the
+    # category counters and (through rollups_changed) the budget alerts
+    # follow too
+    balances.apply_rollup_deltas(deltas)
+    category_totals.apply_rollup_deltas(deltas)
+    rollups_changed.send(sender=MonthlyRollup, deltas=deltas)
+
+
+def record(transactions, sign=1):
+    """
+    Fold a batch of transactions into the rollups with one update per
+    affected key. Bulk write paths call this with sign=1 after inserting
+    and sign=-1 after deleting.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    collect(deltas, transactions, sign)
+    apply_deltas(deltas)
+
+
+def record_change(previous, current):
+    """
+    Move an updated transaction from its previous rollup to its current one
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    collect(deltas, [previous], -1)
+    collect(deltas, [current], 1)
+    apply_deltas(deltas)
+
+
+def move_category(category_id, new_category_id=None):
+    """
+    Merge a category's rollups into another category (or uncategorized),
+    mirroring the SET_NULL applied to its transactions on delete. The rows
+    are read once and merged with the bulk queries.
+    """
+    rows = MonthlyRollup.objects.filter(category_id=category_id)
+    deltas = defaultdict(lambda: [0, 0])
+    for user_id, transaction_type, year, month, total, count in rows.values_list(
+        'user_id', 'transaction_type', 'year', 'month', 'total', 'count'
+    ):
+        delta = deltas[(user_id, new_category_id, transaction_type, year, month)]
+        delta[0] += total
+        delta[1] += count
+
+    with transaction.atomic(savepoint=False):
+        rows.delete()
+        # The balances don't change and the old category's counters go with it
+        if deltas:
+            apply_deltas_in_bulk(deltas)
+
+
+def rebuild(user=None):
+    """
+    Recompute the rollups (and balances, category counters and budget
+    alerts) from the raw transactions for one user or everyone. Returns the
+    number of rollup rows written.
+    """
+    transactions = Transaction.objects.all()
+    rollups = MonthlyRollup.objects.all()
+    if user is not None:
+        transactions = transactions.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    grouped = transactions.annotate(
+        year=ExtractYear('date'),
+        month=ExtractMonth('date')
+    ).values('user_id', 'category_id', 'transaction_type', 'year', 'month').annotate(
+        total=Sum('amount'),
+        count=Count('id')
+    ).order_by()
+
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        written = 0
+        for row in grouped.iterator(chunk_size=BATCH_SIZE):
+            batch.append(MonthlyRollup(**row))
+            if len(batch) >= BATCH_SIZE:
+                MonthlyRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            MonthlyRollup.objects.bulk_create(batch)
+            written += len(batch)
+        balances.rebuild(user)
+        category_totals.rebuild(user)
+        rollups_rebuilt.send(sender=MonthlyRollup, user=user)
+
+    return written
+
+
+def period_range(start, end):
+    """
+    Filter for rollups between two (year, month) pairs, both inclusive
+    """
+    (start_year, start_month), (end_year, end_month) = start, end
+    return (
+        (Q(year__gt=start_year) | Q(year=start_year, month__gte=start_month)) &
+        (Q(year__lt=end_year) | Q(year=end_year, month__lte=end_month))
+    )
@@ -0,0 +1,70 @@
+import re
+from django.db import connection
+from django.db.models import Q
+
+SEARCH_RANK = 'search_rank'
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def tokens(value):
+    return TOKEN.findall(value.lower())
+
+
+def sqlite_search(queryset, terms, user_id=None):
+    # Every term must match as a prefix of a word in description or category name
+    match = '{description category_name} : (%s)' % ' '.join(f'"{term}"*' for term in terms)
+    if user_id is not None:
+        # The indexed owner token limits the MATCH to one user's rows
+        match = f'owner : "u{int(user_id)}" AND {match}'
+    return queryset.extra(
+        tables=['transaction_search'],
+        where=[
+            # The unary + stops SQLite from probing the FTS table once per
+            # transaction row (which it otherwise prefers without ANALYZE
+            # stats) so the MATCH drives the join and rows are fetched by pk
+            '+transaction_search.rowid = transactions_transaction.id',
+            'transaction_search MATCH %s',
+        ],
+        params=[match],
+        # The owner column matches every row alike, leave it out of the rank
+        select={SEARCH_RANK: 'bm25(transaction_search, 1.0, 1.0, 0.0)'},
+    )
+
+
+def postgresql_search(queryset, terms, user_id=None):
+    match = ' & '.join(f'{term}:*' for term in terms)
+    return queryset.extra(
+        where=["transactions_transaction.search_vector @@ to_tsquery('simple', %s)"],
+        params=[match],
+        select={SEARCH_RANK: "-ts_rank(transactions_transaction.search_vector, to_tsquery('simple', %s))"},
+        select_params=[match],
+    )
+
+
+def fallback_search(queryset, terms, user_id=None):
+    condition = Q()
+    for term in terms:
+        condition &= Q(description__icontains=term) | Q(category__name__icontains=term)
+    return queryset.filter(condition)
+
+
+BACKENDS = {
+    'sqlite': sqlite_search,
+    'postgresql': postgresql_search,
+}
+
+
+def search_transactions(queryset, value, user_id=None):
+    """
+    Prefix search over description and category name using the full-text
+    index of the database in use. Matches are ordered best first; the
+    search_rank annotation sorts ascending. Pass the user_id the queryset
+    is limited to so the index lookup is limited to it as well.
+    """
+    terms = tokens(value)
+    if not terms:
+        return queryset
+    backend = BACKENDS.get(connection.vendor)
+    if backend is None:
+        return fallback_search(queryset, terms, user_id)
+    return backend(queryset, terms, user_id).order_by(SEARCH_RANK, '-date', '-id')
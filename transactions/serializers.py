@@ -1,12 +1,13 @@
 from rest_framework import serializers
-from .models import Category, Transaction
+from .models import Category, Transaction, RecurringTransaction
+from .categories import UserCategoryField
 
 class CategorySerializer(serializers.ModelSerializer):
-    total_transactions = serializers.IntegerField(read_only=True)
+    total_transactions = serializers.IntegerField(source='transaction_count', read_only=True)
     class Meta:
         model = Category
-        fields = ['id', 'name', 'description', 'total_transactions']
-        read_only_fields = ['id']
+        fields = ['id', 'name', 'description', 'total_transactions', 'total_income', 'total_expenses']
+        read_only_fields = ['id', 'total_income', 'total_expenses']
     
     def create(self, validated_data):
         # Assign the current user to the category
@@ -14,6 +15,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 class TransactionSerializer(serializers.ModelSerializer):
+    category = UserCategoryField(allow_null=True, required=False)
     category_name = serializers.CharField(source='category.name', read_only=True)
     
     class Meta:
@@ -38,4 +40,56 @@ class TransactionListSerializer(serializers.ModelSerializer):
             'id', 'amount', 'description', 'category', 'category_name',
             'transaction_type', 'date'
         ]
-        read_only_fields = ['id']
\ No newline at end of file
+        read_only_fields = ['id']
+
+class RecurringTransactionSerializer(serializers.ModelSerializer):
+    category = UserCategoryField(allow_null=True, required=False)
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    
+    class Meta:
+        model = RecurringTransaction
+        fields = [
+            'id', 'amount', 'description', 'category', 'category_name', 'transaction_type',
+            'frequency', 'interval', 'start_date', 'end_date', 'next_date', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'next_date', 'created_at', 'updated_at']
+    
+    def validate(self, data):
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if start_date and end_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': "end_date must not be before start_date"})
+        return data
+
+class TransactionImportSerializer(serializers.Serializer):
+    """
+    Validates a single imported row without touching the database; category
+    ownership is checked by the importer against the user's categories
+    """
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    description = serializers.CharField(max_length=255)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    transaction_type = serializers.ChoiceField(choices=Transaction.TRANSACTION_TYPES)
+    date = serializers.DateField()
+
+# Read-optimized list path: same output as TransactionListSerializer, built
+# from .values() rows with the category name joined in
+LIST_VALUES = ['id', 'amount', 'description', 'category', 'category__name', 'transaction_type', 'date']
+AMOUNT_FIELD = TransactionListSerializer().fields['amount']
+
+def list_representation(rows):
+    data = []
+    for row in rows:
+        item = {
+            'id': row['id'],
+            'amount': AMOUNT_FIELD.to_representation(row['amount']),
+            'description': row['description'],
+            'category': row['category'],
+        }
+        # Like the serializer, leave category_name out for uncategorized rows
+        if row['category'] is not None:
+            item['category_name'] = row['category__name']
+        item['transaction_type'] = row['transaction_type']
+        item['date'] = row['date'].isoformat()
+        data.append(item)
+    return data
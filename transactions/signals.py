@@ -0,0 +1,59 @@
+from django.db.models.signals import pre_save, post_save, post_delete, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Category, Transaction
+from accounts.cache import next_version
+from . import rollups, sync
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    # Keep the stored version around so post_save can move it out of its old rollup
+    instance._previous = None
+    if raw or instance.pk is None:
+        return
+    instance._previous = Transaction.objects.filter(pk=instance.pk).only(
+        'user', 'category', 'transaction_type', 'date', 'amount'
+    ).first()
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    if previous is not None:
+        rollups.record_change(previous, instance)
+    else:
+        rollups.record([instance])
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollups_on_delete(sender, instance, origin=None, **kwargs):
+    # A deleted user's rollups, balances, counters and alerts go with them
+    if not sync.deleting_user(origin):
+        rollups.record([instance], sign=-1)
+
+
+@receiver(pre_delete, sender=Category)
+def move_rollups_on_category_delete(sender, instance, origin=None, **kwargs):
+    # Transactions fall back to no category (SET_NULL), so do their rollups
+    if not sync.deleting_user(origin):
+        rollups.move_category(instance.pk)
+
+
+@receiver(pre_delete, sender=Category)
+def touch_transactions_on_category_delete(sender, instance, origin=None, **kwargs):
+    # SET_NULL bypasses save(), so mark the transactions as changed for sync clients
+    if not sync.deleting_user(origin):
+        instance.transactions.update(updated_at=timezone.now(), version=next_version(instance.user_id))
+
+
+@receiver(post_delete, sender=Transaction)
+def record_transaction_deletion(sender, instance, origin=None, **kwargs):
+    sync.record_deletion(instance, 'transaction', origin)
+
+
+@receiver(post_delete, sender=Category)
+def record_category_deletion(sender, instance, origin=None, **kwargs):
+    sync.record_deletion(instance, 'category', origin)
@@ -0,0 +1,148 @@
+import json
+import os
+import struct
+import sys
+import zipfile
+from array import array
+from datetime import date
+from .models import Transaction
+
+CHUNK_SIZE = 10000
+FORMAT_VERSION = 1
+MANIFEST = 'manifest.json'
+
+# .npy files (format version 1.0) with a fixed-size header, so the row
+# count can be filled in once the last chunk is written
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_SIZE = 128
+EPOCH = date(1970, 1, 1).toordinal()
+TRANSACTION_TYPES = [value for value, label in Transaction.TRANSACTION_TYPES]
+
+# name -> (array typecode, numpy dtype)
+COLUMNS = {
+    'id': ('q', '<i8'),
+    'user': ('q', '<i8'),
+    # Days since 1970-01-01, which numpy reads as datetime64[D]
+    'date': ('q', '<M8[D]'),
+    'amount_cents': ('q', '<i8'),
+    # Indexes into the manifest's dictionaries, -1 for uncategorized
+    'transaction_type': ('b', '|i1'),
+    'category': ('i', '<i4'),
+    # UTF-8 descriptions back to back; row i is data[offsets[i]:offsets[i + 1]]
+    'description.offsets': ('q', '<i8'),
+    'description.data': ('B', '|u1'),
+}
+
+
+def npy_header(dtype, length):
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (dtype, length)
+    header = header.ljust(NPY_HEADER_SIZE - len(NPY_MAGIC) - 3) + '\n'
+    return NPY_MAGIC + struct.pack('<H', len(header)) + header.encode('latin1')
+
+
+class Column:
+    """
+    A one-dimensional .npy file appended to one chunk at a time
+    """
+    def __init__(self, path, typecode, dtype):
+        self.typecode = typecode
+        self.dtype = dtype
+        self.length = 0
+        self.buffer = array(typecode)
+        self.file = open(path, 'wb')
+        self.file.write(npy_header(dtype, 0))
+
+    def flush(self):
+        if sys.byteorder == 'big':
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.length += len(self.buffer)
+        self.buffer = array(self.typecode)
+
+    def close(self):
+        self.flush()
+        self.file.seek(0)
+        self.file.write(npy_header(self.dtype, self.length))
+        self.file.close()
+
+
+def write_snapshot(queryset, directory, chunk_size=CHUNK_SIZE):
+    """
+    Write transactions as one .npy file per column plus a manifest.json
+    holding the row count and the category and type dictionaries. Rows are
+    read with .iterator() and written chunk by chunk, so memory use doesn't
+    grow with the export; every column can be memory-mapped downstream,
+    e.g. numpy.load(path, mmap_mode='r'). Returns the manifest.
+    """
+    rows = queryset.order_by('id').values_list(
+        'id', 'user_id', 'date', 'amount', 'transaction_type',
+        'category_id', 'category__name', 'description'
+    ).iterator(chunk_size=chunk_size)
+
+    columns = {
+        name: Column(os.path.join(directory, f'{name}.npy'), typecode, dtype)
+        for name, (typecode, dtype) in COLUMNS.items()
+    }
+    ids, users, dates, amounts, types, categories, offsets, data = (
+        column.buffer for column in columns.values()
+    )
+    type_codes = {value: code for code, value in enumerate(TRANSACTION_TYPES)}
+    category_codes = {}
+    dictionary = []
+    offset = 0
+    offsets.append(0)
+    pending = 0
+
+    try:
+        for pk, user_id, day, amount, transaction_type, category_id, category_name, description in rows:
+            ids.append(pk)
+            users.append(user_id)
+            dates.append(day.toordinal() - EPOCH)
+            amounts.append(int(amount * 100))
+            types.append(type_codes[transaction_type])
+            if category_id is None:
+                categories.append(-1)
+            else:
+                if category_id not in category_codes:
+                    category_codes[category_id] = len(dictionary)
+                    dictionary.append({'id': category_id, 'name': category_name})
+                categories.append(category_codes[category_id])
+            encoded = description.encode('utf-8')
+            data.frombytes(encoded)
+            offset += len(encoded)
+            offsets.append(offset)
+
+            pending += 1
+            if pending >= chunk_size:
+                for column in columns.values():
+                    column.flush()
+                ids, users, dates, amounts, types, categories, offsets, data = (
+                    column.buffer for column in columns.values()
+                )
+                pending = 0
+    finally:
+        for column in columns.values():
+            column.close()
+
+    manifest = {
+        'version': FORMAT_VERSION,
+        'rows': columns['id'].length,
+        'columns': {name: {'file': f'{name}.npy', 'dtype': dtype} for name, (typecode, dtype) in COLUMNS.items()},
+        'dictionaries': {
+            'transaction_type': TRANSACTION_TYPES,
+            'category': dictionary,
+        },
+    }
+    with open(os.path.join(directory, MANIFEST), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def bundle(directory, file):
+    """
+    Pack a written snapshot into an uncompressed zip, i.e. a .npz archive
+    that numpy.load opens directly and whose members stay mappable in place
+    """
+    with zipfile.ZipFile(file, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for name in [MANIFEST] + [f'{name}.npy' for name in COLUMNS]:
+            archive.write(os.path.join(directory, name), name)
@@ -0,0 +1,181 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from accounts.cache import get_version, next_version, next_versions
+from accounts.models import Tombstone
+from .models import Category, Transaction
+from .serializers import AMOUNT_FIELD
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 90))
+
+
+def deleted_with(origin, *models):
+    """
+    Whether a delete signal comes from deleting an instance or queryset of
+    one of models, i.e. the sender is only being removed by the cascade
+    """
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, models)
+    return isinstance(origin, models)
+
+
+def deleting_user(origin):
+    return deleted_with(origin, User)
+
+
+def record_deletion(instance, model, origin=None):
+    """
+    Leave a tombstone for a deleted object, unless its whole account is
+    being deleted
+    """
+    if not deleting_user(origin):
+        Tombstone.objects.create(
+            user_id=instance.user_id, model=model, object_id=instance.pk, version=next_version(instance.user_id)
+        )
+
+
+def record_deletions(rows, model):
+    """
+    Tombstones for many deleted objects at once from (user_id, pk) rows
+    """
+    rows = list(rows)
+    if not rows:
+        return
+    versions = next_versions(user_id for user_id, pk in rows)
+    Tombstone.objects.bulk_create(
+        [Tombstone(user_id=user_id, model=model, object_id=pk, version=versions[user_id]) for user_id, pk in rows],
+        batch_size=1000
+    )
+
+
+def transaction_row(row):
+    row['amount'] = AMOUNT_FIELD.to_representation(row['amount'])
+    row['date'] = row['date'].isoformat()
+    return row
+
+
+# name -> (queryset, fields sent, row formatter); other apps add theirs
+# with register_stream()
+STREAMS = {
+    'transactions': (
+        Transaction.objects.all(),
+        ['id', 'amount', 'description', 'category', 'transaction_type', 'date'], transaction_row
+    ),
+    'categories': (Category.objects.all(), ['id', 'name', 'description'], None),
+    'deleted': (Tombstone.objects.all(), ['id', 'model', 'object_id'], None),
+}
+DELETED_KEYS = {'transaction': 'transactions', 'category': 'categories'}
+
+
+def register_stream(name, model, queryset, fields, formatter=None):
+    """
+    Sync another app's per-user rows as stream `name`. The model needs the
+    user and version fields, and its deletions are recorded with
+    record_deletion(instance, model).
+    """
+    STREAMS[name] = (queryset, fields, formatter)
+    DELETED_KEYS[model] = name
+
+
+def decode_cursor(encoded):
+    """
+    (issued at, stream name -> (version, id) position); raises ValueError
+    when invalid. Cursors from before versions were used decode to
+    (None, None), which makes the client start over.
+    """
+    try:
+        raw = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        if 'streams' not in raw:
+            if all(name in STREAMS for name in raw):
+                return None, None
+            raise ValueError
+        positions = {}
+        for name, (version, pk) in raw['streams'].items():
+            if name not in STREAMS or not isinstance(version, int) or not (pk is None or isinstance(pk, int)):
+                raise ValueError
+            positions[name] = (version, pk)
+        return datetime.fromisoformat(raw['at']), positions
+    except (TypeError, ValueError, AttributeError, UnicodeError, KeyError):
+        raise ValueError('Invalid cursor')
+
+
+def encode_cursor(at, positions):
+    raw = {'at': at.isoformat(), 'streams': {name: list(position) for name, position in positions.items()}}
+    return base64.urlsafe_b64encode(json.dumps(raw).encode('ascii')).decode('ascii')
+
+
+def after(position):
+    # (version, id) > (version, pk); a pk of None means that whole version was seen
+    version, pk = position
+    if pk is None:
+        return Q(version__gt=version)
+    return Q(version__gt=version) | Q(version=version, id__gt=pk)
+
+
+def changes(user, cursor=None, limit=DEFAULT_LIMIT):
+    """
+    Everything created, updated or deleted in a user's transactions,
+    categories and budgets since cursor (from the start without one), with
+    at most `limit` rows per kind. Every write stamps its rows with the
+    user's data version, which is handed out in commit order (see
+    accounts.cache.next_versions), so reading up to the current version
+    can't pass over a write that is still committing. Each kind is read in
+    (version, id) order from a (user, version, id) index, so the cost
+    follows the number of changes rather than the size of the history.
+    Call again with the returned cursor while has_more is true.
+    """
+    now = timezone.now()
+    # Read first: every write up to this version has committed
+    upper = get_version(user.pk)
+    at, positions = decode_cursor(cursor) if cursor else (now, {})
+
+    # Tombstones past the retention period are pruned; a client that last
+    # synced before that has to start over
+    reset = positions is None or at < now - tombstone_retention()
+    if reset:
+        positions = {}
+
+    data = {name: [] for name in DELETED_KEYS.values()}
+    deleted = {key: [] for key in DELETED_KEYS.values()}
+    next_positions = {}
+    has_more = False
+    for name, (queryset, fields, formatter) in STREAMS.items():
+        if name == 'deleted' and name not in positions:
+            # A full sync has no copies to drop
+            next_positions[name] = (upper, None)
+            continue
+        rows = queryset.filter(user=user, version__lte=upper)
+        if name in positions:
+            rows = rows.filter(after(positions[name]))
+        rows = list(rows.order_by('version', 'id').values('version', *fields)[:limit + 1])
+
+        if len(rows) > limit:
+            has_more = True
+            rows = rows[:limit]
+            next_positions[name] = (rows[-1]['version'], rows[-1]['id'])
+        else:
+            next_positions[name] = (upper, None)
+
+        for row in rows:
+            del row['version']
+            if name == 'deleted':
+                deleted[DELETED_KEYS[row['model']]].append(row['object_id'])
+            else:
+                data[name].append(formatter(row) if formatter else row)
+
+    return {
+        'cursor': encode_cursor(now, next_positions),
+        'has_more': has_more,
+        'reset': reset,
+        **data,
+        'deleted': deleted,
+    }
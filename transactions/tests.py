@@ -1,3 +1,607 @@
-from django.test import TestCase
+import base64
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection
+from django.db.models import Sum
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from accounts.cache import get_version, next_version
+from accounts.models import Tombstone
+from budgets.models import Budget
+from .dashboard import add_months, build_dashboard
+from .dashboard_serializers import DashboardSummarySerializer
+from .models import Balance, Category, MonthlyRollup, RecurringTransaction, Transaction
+from .serializers import TransactionListSerializer
+from . import balances, category_totals, recurring, rollups, sync
 
-# Create your tests here.
+
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+def add_transaction(user, amount, description='Transaction', category=None, transaction_type='expense', day=None):
+    return Transaction.objects.create(
+        user=user,
+        amount=Decimal(amount),
+        description=description,
+        category=category,
+        transaction_type=transaction_type,
+        date=day or date(2026, 3, 15)
+    )
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.other = User.objects.create_user('bob', password='secret')
+        self.groceries = Category.objects.create(user=self.user, name='Groceries')
+        add_transaction(self.user, '4.50', 'Coffee beans', self.groceries)
+        add_transaction(self.user, '12.00', 'Cinema tickets')
+        add_transaction(self.other, '3.20', 'Coffee to go')
+        add_transaction(self.other, '8.00', 'Coffee filters')
+
+    def search(self, user, value):
+        response = api_client(user).get('/api/transactions/', {'search': value})
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['description'] for row in response.data['results'])
+
+    def test_matches_only_own_transactions(self):
+        self.assertEqual(self.search(self.user, 'coffee'), ['Coffee beans'])
+        self.assertEqual(self.search(self.other, 'coffee'), ['Coffee filters', 'Coffee to go'])
+
+    def test_matches_prefixes_and_category_names(self):
+        self.assertEqual(self.search(self.user, 'cof'), ['Coffee beans'])
+        self.assertEqual(self.search(self.user, 'groc'), ['Coffee beans'])
+        self.assertEqual(self.search(self.other, 'groc'), [])
+
+    def test_user_token_is_not_searchable(self):
+        self.assertEqual(self.search(self.user, f'u{self.user.pk}'), [])
+        self.assertEqual(self.search(self.user, f'u{self.other.pk}'), [])
+
+    def test_follows_updates_and_deletes(self):
+        transaction = Transaction.objects.get(description='Cinema tickets')
+        transaction.description = 'Theatre tickets'
+        transaction.save()
+        self.assertEqual(self.search(self.user, 'theatre'), ['Theatre tickets'])
+        transaction.delete()
+        self.assertEqual(self.search(self.user, 'theatre'), [])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.client = api_client(self.user)
+        categories = [None, Category.objects.create(user=self.user, name='Food'), Category.objects.create(user=self.user, name='Bills')]
+        # Few distinct values, so every page boundary falls inside a run of ties
+        for number in range(23):
+            add_transaction(
+                self.user, ['5.00', '10.00'][number % 2], f'Transaction {number}',
+                categories[number % 3], day=date(2026, 3, 1 + number % 3)
+            )
+        add_transaction(User.objects.create_user('bob', password='secret'), '5.00', 'Other user')
+
+    def pages(self, **params):
+        response = self.client.get('/api/transactions/', {'cursor': '', 'page_size': 4, **params})
+        pages = []
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data['results'])
+            if response.data['links']['next'] is None:
+                return pages
+            response = self.client.get(response.data['links']['next'])
+
+    def test_pages_have_no_duplicates_or_gaps(self):
+        expected = sorted(Transaction.objects.filter(user=self.user).values_list('id', flat=True))
+        for ordering in ['-date', 'date', 'amount', '-amount', 'category__name', '-category__name', '-created_at']:
+            with self.subTest(ordering=ordering):
+                pages = self.pages(ordering=ordering)
+                ids = [row['id'] for page in pages for row in page]
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(sorted(ids), expected)
+                self.assertEqual(len(pages), 6)
+
+    def test_follows_the_ordering(self):
+        rows = [row for page in self.pages(ordering='-amount') for row in page]
+        keys = [(-Decimal(row['amount']), row['id']) for row in rows]
+        self.assertEqual(keys, sorted(keys))
+
+    def test_rows_added_behind_the_cursor_are_not_repeated(self):
+        first = self.client.get('/api/transactions/', {'cursor': '', 'page_size': 10})
+        add_transaction(self.user, '1.00', 'Newest', day=date(2026, 4, 1))
+        second = self.client.get(first.data['links']['next'])
+        ids = [row['id'] for row in first.data['results'] + second.data['results']]
+        self.assertEqual(len(ids), len(set(ids)))
+
+    def test_count_is_opt_in(self):
+        self.assertNotIn('count', self.client.get('/api/transactions/', {'cursor': ''}).data)
+        self.assertEqual(self.client.get('/api/transactions/', {'cursor': '', 'count': 1}).data['count'], 23)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/transactions/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_tampered_cursor(self):
+        cases = [
+            ('-date', ['notadate', 1]),
+            ('-date', [{'a': 1}, 1]),
+            ('-date', ['2024-01-01', 'x']),
+            ('-date', [None, 1]),
+            ('amount', ['lots', 1]),
+            ('-created_at', [[2024], 1]),
+            ('-date', ['2024-01-01']),
+        ]
+        for ordering, position in cases:
+            with self.subTest(ordering=ordering, position=position):
+                cursor = base64.urlsafe_b64encode(json.dumps(position).encode('ascii')).decode('ascii')
+                response = self.client.get('/api/transactions/', {'cursor': cursor, 'ordering': ordering})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.data['detail'], 'Invalid cursor')
+
+
+class ImportTests(TestCase):
+    HEADER = 'amount,description,category,transaction_type,date\n'
+
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.client = api_client(self.user)
+
+    def upload(self, content, **params):
+        file = SimpleUploadedFile('transactions.csv', content, content_type='text/csv')
+        query = '&'.join(f'{key}={value}' for key, value in params.items())
+        return self.client.post(f'/api/transactions/import/?{query}', {'file': file}, format='multipart')
+
+    def test_csv_upload_and_body(self):
+        response = self.upload((self.HEADER + '4.50,Coffee,,expense,2026-03-01\n').encode('utf-8-sig'))
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(
+            '/api/transactions/import/', self.HEADER + '9.00,Café,,expense,2026-03-02\n', content_type='text/csv'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(sorted(Transaction.objects.values_list('description', flat=True)), ['Café', 'Coffee'])
+
+    def test_invalid_rows_are_reported(self):
+        response = self.upload((self.HEADER + '4.50,Coffee,,expense,2026-03-01\nlots,Bad,,expense,2026-03-01\n').encode())
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['failed']), (1, 1))
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+
+    def test_bad_encoding_rolls_back(self):
+        rows = ''.join(f'{number}.00,Row {number},,expense,2026-03-01\n' for number in range(1, 4))
+        content = (self.HEADER + rows + '5.00,Caf\u00e9,,expense,2026-03-01\n').encode('latin-1')
+        response = self.upload(content, batch_size=1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.data['error'])
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_malformed_csv(self):
+        # Longer than csv.field_size_limit()
+        response = self.upload((self.HEADER + '4.50,' + 'x' * 200000 + ',,expense,2026-03-01\n').encode())
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Invalid CSV', response.data['error'])
+
+    def test_missing_column(self):
+        response = self.upload(b'amount,description,date\n4.50,Coffee,2026-03-01\n')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['error'], 'CSV is missing the column(s): transaction_type')
+        self.assertEqual(self.upload(b'').status_code, 400)
+
+    def test_bad_batch_size(self):
+        content = (self.HEADER + '4.50,Coffee,,expense,2026-03-01\n').encode()
+        for batch_size in ['0', '5001', 'many']:
+            with self.subTest(batch_size=batch_size):
+                response = self.upload(content, batch_size=batch_size)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['error'], 'batch_size must be between 1 and 5000')
+        self.assertFalse(Transaction.objects.exists())
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.other = User.objects.create_user('bob', password='secret')
+        self.client = api_client(self.user)
+        self.food = Category.objects.create(user=self.user, name='Food')
+        self.bills = Category.objects.create(user=self.user, name='Bills')
+        add_transaction(self.user, '10.00', 'Rent')
+        for number in range(6):
+            add_transaction(self.user, '2.50', f'Snack {number}', self.food)
+        Budget.objects.create(user=self.user, category=self.food, amount=Decimal('50.00'), month=3, year=2026)
+        Budget.objects.create(user=self.user, category=self.bills, amount=Decimal('80.00'), month=3, year=2026)
+        add_transaction(self.other, '1.00', 'Other user')
+        self.replica = {'transactions': {}, 'categories': {}, 'budgets': {}}
+
+    def sync(self, cursor=None, **params):
+        if cursor:
+            params['cursor'] = cursor
+        response = self.client.get('/api/transactions/sync/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def pull(self, cursor=None, limit=None):
+        """
+        Apply pages to the replica until has_more is false; returns the
+        last cursor and the number of pages
+        """
+        pages = 0
+        while True:
+            data = self.sync(cursor, **({'limit': limit} if limit else {}))
+            pages += 1
+            if data['reset']:
+                for rows in self.replica.values():
+                    rows.clear()
+            for name, rows in self.replica.items():
+                rows.update((row['id'], row) for row in data[name])
+                for pk in data['deleted'][name]:
+                    rows.pop(pk, None)
+            cursor = data['cursor']
+            if not data['has_more']:
+                return cursor, pages
+
+    def assertReplicaMatches(self):
+        transactions = Transaction.objects.filter(user=self.user)
+        self.assertEqual(
+            {pk: (row['description'], row['amount'], row['category']) for pk, row in self.replica['transactions'].items()},
+            {t.pk: (t.description, str(t.amount), t.category_id) for t in transactions}
+        )
+        self.assertEqual(
+            {pk: row['name'] for pk, row in self.replica['categories'].items()},
+            dict(Category.objects.filter(user=self.user).values_list('pk', 'name'))
+        )
+        self.assertEqual(
+            {pk: row['amount'] for pk, row in self.replica['budgets'].items()},
+            {budget.pk: str(budget.amount) for budget in Budget.objects.filter(user=self.user)}
+        )
+
+    def test_full_sync_in_pages(self):
+        cursor, pages = self.pull(limit=3)
+        self.assertEqual(pages, 3)
+        self.assertReplicaMatches()
+
+        data = self.sync(cursor)
+        self.assertFalse(data['has_more'])
+        self.assertEqual(data['transactions'], [])
+        self.assertEqual(data['deleted'], {'transactions': [], 'categories': [], 'budgets': []})
+
+    def test_round_trip_of_changes_and_deletes(self):
+        cursor, pages = self.pull()
+        rent = Transaction.objects.get(description='Rent')
+        rent.amount = Decimal('11.00')
+        rent.save()
+        Transaction.objects.get(description='Snack 0').delete()
+        Budget.objects.get(category=self.bills).delete()
+        Category.objects.create(user=self.user, name='Travel')
+        self.client.post('/api/transactions/import/', [
+            {'amount': '4.00', 'description': 'Imported', 'transaction_type': 'expense', 'date': '2026-03-02'}
+        ], format='json')
+        self.client.post('/api/budgets/bulk/', [
+            {'category': self.bills.pk, 'amount': '90.00', 'month': 4, 'year': 2026}
+        ], format='json')
+
+        cursor, pages = self.pull(cursor, limit=2)
+        self.assertReplicaMatches()
+
+        # The food category's budget goes with it, its transactions lose it
+        self.food.delete()
+        cursor, pages = self.pull(cursor, limit=2)
+        self.assertReplicaMatches()
+
+        data = self.sync(cursor)
+        self.assertEqual(data['transactions'] + data['categories'] + data['budgets'], [])
+        self.assertEqual(sync.decode_cursor(data['cursor'])[1], sync.decode_cursor(cursor)[1])
+
+    def test_deleting_a_user_leaves_no_tombstones(self):
+        self.other.delete()
+        self.assertFalse(Tombstone.objects.filter(user_id=self.other.pk).exists())
+
+    def test_cursor_past_the_tombstone_retention_resets(self):
+        cursor, pages = self.pull()
+        issued = timezone.now() - timedelta(days=sync.tombstone_retention().days + 1)
+        old = sync.encode_cursor(issued, sync.decode_cursor(cursor)[1])
+        data = self.sync(old)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['transactions']), 7)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.get('/api/transactions/sync/', {'cursor': 'garbage'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/transactions/sync/', {'limit': 0}).status_code, 400)
+
+    def test_write_still_committing_is_not_skipped(self):
+        # A write that took its version but hasn't bumped the user's
+        # visible version yet, as seen from another connection
+        pending = Transaction.objects.bulk_create([Transaction(
+            user=self.user, amount=Decimal('5.00'), description='Late', transaction_type='expense',
+            date=date(2026, 3, 1), version=get_version(self.user.pk) + 1
+        )])[0]
+        first = self.sync()
+        self.assertNotIn(pending.pk, [row['id'] for row in first['transactions']])
+
+        next_version(self.user.pk)
+        add_transaction(self.user, '7.00', 'Lunch')
+        second = self.sync(first['cursor'])
+        self.assertEqual(sorted(row['id'] for row in second['transactions']), sorted([
+            pending.pk, Transaction.objects.get(description='Lunch').pk
+        ]))
+
+    def test_cursor_from_before_versions_resets(self):
+        legacy = {'transactions': ['2026-03-01T00:00:00+00:00', None]}
+        cursor = base64.urlsafe_b64encode(json.dumps(legacy).encode('ascii')).decode('ascii')
+        data = self.sync(cursor)
+        self.assertTrue(data['reset'])
+        self.assertEqual(len(data['transactions']), 7)
+
+
+class MaintainedStateMixin:
+    """
+    Puts a user's transactions through every kind of write and checks after
+    each one that the maintained state() is what rebuild() recomputes from
+    the raw transactions
+    """
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        self.other = User.objects.create_user('bob', password='secret')
+        self.food = Category.objects.create(user=self.user, name='Food')
+        self.salary = Category.objects.create(user=self.user, name='Salary')
+        self.client = api_client(self.user)
+        add_transaction(self.user, '12.50', 'Lunch', self.food)
+        add_transaction(self.user, '3000.00', 'March pay', self.salary, 'income')
+        add_transaction(self.user, '40.00', 'Cash', day=date(2026, 2, 27))
+        add_transaction(self.other, '99.00', 'Other user', Category.objects.create(user=self.other, name='Food'))
+
+    def assertMatchesRebuild(self):
+        maintained = self.state()
+        self.rebuild()
+        self.assertEqual(maintained, self.state())
+
+    def test_create(self):
+        response = self.client.post('/api/transactions/', {
+            'amount': '7.25', 'description': 'Coffee', 'category': self.food.pk,
+            'transaction_type': 'expense', 'date': '2026-03-20'
+        })
+        self.assertEqual(response.status_code, 201)
+        add_transaction(self.user, '5.00', 'Snack', day=date(2026, 3, 2))
+        self.assertMatchesRebuild()
+
+    def test_update(self):
+        transaction = Transaction.objects.get(description='Lunch')
+        for field, value in [
+            ('amount', Decimal('20.00')),
+            ('date', date(2026, 1, 31)),
+            ('category', self.salary),
+            ('transaction_type', 'income'),
+            ('category', None),
+        ]:
+            setattr(transaction, field, value)
+            transaction.save()
+            self.assertMatchesRebuild()
+
+        response = self.client.patch(f'/api/transactions/{transaction.pk}/', {'category': self.food.pk, 'date': '2026-04-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        response = self.client.delete(f'/api/transactions/{Transaction.objects.get(description="Lunch").pk}/')
+        self.assertEqual(response.status_code, 204)
+        Transaction.objects.get(description='Cash').delete()
+        self.assertMatchesRebuild()
+
+    def test_category_delete(self):
+        add_transaction(self.user, '8.00', 'Dinner', self.food, day=date(2026, 2, 10))
+        response = self.client.delete(f'/api/transactions/categories/{self.food.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertMatchesRebuild()
+
+    def test_import(self):
+        # Enough months and categories to take the bulk path
+        rows = [
+            {
+                'amount': f'{month}.50', 'description': f'Row {month}', 'category': category,
+                'transaction_type': transaction_type, 'date': f'{2020 + month // 12}-{month % 12 + 1:02d}-05'
+            }
+            for month in range(30)
+            for category, transaction_type in [(self.food.pk, 'expense'), (None, 'income')]
+        ]
+        response = self.client.post('/api/transactions/import/', rows, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(len(rows), rollups.BULK_THRESHOLD)
+        self.assertMatchesRebuild()
+
+    def test_recurring(self):
+        RecurringTransaction.objects.create(
+            user=self.user, amount=Decimal('9.99'), description='Streaming', category=self.food,
+            transaction_type='expense', frequency='monthly', start_date=date(2025, 11, 30), next_date=date(2025, 11, 30)
+        )
+        recurring.materialize(date(2026, 3, 31))
+        self.assertEqual(Transaction.objects.filter(description='Streaming').count(), 5)
+        self.assertMatchesRebuild()
+
+
+class RollupTests(MaintainedStateMixin, TestCase):
+    def state(self):
+        return sorted(MonthlyRollup.objects.values_list(
+            'user_id', 'category_id', 'transaction_type', 'year', 'month', 'total', 'count'
+        ), key=repr)
+
+    def rebuild(self):
+        rollups.rebuild()
+
+    def test_user_delete(self):
+        self.user.delete()
+        self.assertFalse(MonthlyRollup.objects.filter(user_id=self.user.pk).exists())
+        self.assertMatchesRebuild()
+
+    def test_only_removals_drop_rows(self):
+        # Adding to existing rollup and balance rows can't empty them
+        with CaptureQueriesContext(connection) as queries:
+            dinner = add_transaction(self.user, '8.00', 'Dinner', self.food)
+        self.assertFalse([query['sql'] for query in queries if query['sql'].startswith('DELETE')])
+
+        with CaptureQueriesContext(connection) as queries:
+            dinner.delete()
+        deletes = [query['sql'] for query in queries if query['sql'].startswith('DELETE')]
+        self.assertTrue(any('transactions_monthlyrollup' in sql for sql in deletes))
+        self.assertTrue(any('transactions_balance' in sql for sql in deletes))
+        self.assertMatchesRebuild()
+
+    def test_one_uncategorized_row_per_key(self):
+        rollup = MonthlyRollup.objects.get(user=self.user, category=None)
+        with self.assertRaises(IntegrityError):
+            MonthlyRollup.objects.create(
+                user=self.user, category=None, transaction_type=rollup.transaction_type,
+                year=rollup.year, month=rollup.month, total=1, count=1
+            )
+
+
+class BalanceTests(MaintainedStateMixin, TestCase):
+    def state(self):
+        self.assertEqual(balances.verify(), [])
+        return sorted(Balance.objects.values_list('user_id', 'transaction_type', 'total', 'count'))
+
+    def rebuild(self):
+        balances.rebuild()
+
+
+class AtomicWriteTests(TransactionTestCase):
+    """
+    Without TestCase's enclosing transaction, so each write commits or
+    rolls back on its own as it does in a request
+    """
+    def test_failed_write_leaves_nothing_behind(self):
+        user = User.objects.create_user('alice', password='secret')
+        lunch = add_transaction(user, '12.50', 'Lunch', Category.objects.create(user=user, name='Food'))
+        add_transaction(user, '40.00', 'Cash')
+        before = sorted(Balance.objects.values_list('user_id', 'transaction_type', 'total', 'count'))
+
+        with mock.patch('budgets.alerts.apply_rollup_deltas', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                add_transaction(user, '1.00', 'Failed')
+            with self.assertRaises(RuntimeError):
+                lunch.amount = Decimal('99.00')
+                lunch.save()
+            with self.assertRaises(RuntimeError):
+                Transaction.objects.get(description='Cash').delete()
+
+        self.assertFalse(Transaction.objects.filter(description='Failed').exists())
+        self.assertEqual(Transaction.objects.get(pk=lunch.pk).amount, Decimal('12.50'))
+        self.assertTrue(Transaction.objects.filter(description='Cash').exists())
+        self.assertEqual(sorted(Balance.objects.values_list('user_id', 'transaction_type', 'total', 'count')), before)
+        self.assertEqual(balances.verify(), [])
+
+
+class CategoryCounterTests(MaintainedStateMixin, TestCase):
+    def state(self):
+        return sorted(Category.objects.values_list('pk', *Category.COUNTERS))
+
+    def rebuild(self):
+        category_totals.rebuild()
+
+    def test_saving_a_stale_instance_keeps_the_counters(self):
+        stale = Category.objects.get(pk=self.food.pk)
+        add_transaction(self.user, '4.00', 'Fruit', self.food)
+        stale.name = 'Groceries'
+        stale.save()
+        self.assertMatchesRebuild()
+        self.assertEqual(Category.objects.get(pk=self.food.pk).transaction_count, 2)
+
+    def test_listed_with_their_totals(self):
+        response = self.client.get('/api/transactions/categories/')
+        self.assertEqual(response.status_code, 200)
+        food = next(row for row in response.data['results'] if row['id'] == self.food.pk)
+        self.assertEqual(
+            (food['total_transactions'], food['total_income'], food['total_expenses']), (1, '0.00', '12.50')
+        )
+
+
+def per_month_dashboard(user, today):
+    """
+    The dashboard as it was computed before the rollups: straight from the
+    transactions, with two aggregates per month of the series
+    """
+    transactions = Transaction.objects.filter(user=user)
+    total_income = transactions.filter(transaction_type='income').aggregate(Sum('amount'))['amount__sum'] or 0
+    total_expenses = transactions.filter(transaction_type='expense').aggregate(Sum('amount'))['amount__sum'] or 0
+
+    breakdowns = {}
+    for transaction_type in ('income', 'expense'):
+        rows = transactions.filter(transaction_type=transaction_type).values('category__name').annotate(total=Sum('amount'))
+        breakdowns[transaction_type] = {row['category__name']: row['total'] for row in rows if row['category__name']}
+
+    monthly_summary = []
+    for i in range(5, -1, -1):
+        month = (today.month - i) % 12 or 12
+        year = today.year - 1 if today.month - i <= 0 else today.year
+        month_income = transactions.filter(
+            transaction_type='income', date__month=month, date__year=year
+        ).aggregate(Sum('amount'))['amount__sum'] or 0
+        month_expenses = transactions.filter(
+            transaction_type='expense', date__month=month, date__year=year
+        ).aggregate(Sum('amount'))['amount__sum'] or 0
+        monthly_summary.append({
+            'month': month, 'year': year, 'income': month_income, 'expenses': month_expenses,
+            'net': month_income - month_expenses
+        })
+
+    return {
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'net_balance': total_income - total_expenses,
+        'expense_by_category': breakdowns['expense'],
+        'income_by_category': breakdowns['income'],
+        'monthly_summary': monthly_summary,
+        'recent_transactions': TransactionListSerializer(transactions.order_by('-date')[:5], many=True).data,
+        'budget_status': [],
+    }
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('alice', password='secret')
+        food = Category.objects.create(user=self.user, name='Food')
+        salary = Category.objects.create(user=self.user, name='Salary')
+        # Breakdowns go by name, so both of these count as one
+        other_food = Category.objects.create(user=self.user, name='Food')
+        for amount, description, category, transaction_type, day in [
+            ('12.50', 'Lunch', food, 'expense', date(2025, 8, 31)),
+            ('3000.00', 'September pay', salary, 'income', date(2025, 9, 1)),
+            ('40.10', 'Cash', None, 'expense', date(2025, 9, 14)),
+            ('250.00', 'Gift', None, 'income', date(2025, 10, 3)),
+            ('7.25', 'Coffee', other_food, 'expense', date(2025, 12, 31)),
+            ('19.99', 'Groceries', food, 'expense', date(2026, 1, 1)),
+            ('3100.00', 'January pay', salary, 'income', date(2026, 1, 30)),
+            ('0.01', 'Rounding', None, 'expense', date(2026, 2, 2)),
+            ('60.00', 'Next month', food, 'expense', date(2026, 3, 1)),
+        ]:
+            add_transaction(self.user, amount, description, category, transaction_type, day)
+        add_transaction(User.objects.create_user('bob', password='secret'), '99.00', 'Other user', day=date(2026, 1, 5))
+
+    def test_matches_the_per_month_computation(self):
+        # Windows across the year boundary, with months that have no transactions
+        for today in [date(2026, 2, 15), date(2026, 1, 1), date(2025, 12, 31), date(2026, 6, 30), date(2025, 3, 1)]:
+            with self.subTest(today=today):
+                dashboard = DashboardSummarySerializer(build_dashboard(self.user, today)).data
+                self.assertEqual(dashboard, DashboardSummarySerializer(per_month_dashboard(self.user, today)).data)
+                self.assertEqual(
+                    [(row['year'], row['month']) for row in dashboard['monthly_summary']][::5],
+                    [add_months(today.year, today.month, -5), (today.year, today.month)]
+                )
+
+    def test_user_without_transactions(self):
+        user = User.objects.create_user('carol', password='secret')
+        self.assertEqual(
+            DashboardSummarySerializer(build_dashboard(user, date(2026, 1, 15))).data,
+            DashboardSummarySerializer(per_month_dashboard(user, date(2026, 1, 15))).data
+        )
+
+    def test_endpoint(self):
+        response = api_client(self.user).get('/api/transactions/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        expected = per_month_dashboard(self.user, timezone.now().date())
+        self.assertEqual(response.json(), json.loads(JSONRenderer().render(expected)))
@@ -4,6 +4,7 @@ from . import views
 
 router = DefaultRouter()
 router.register(r'categories', views.CategoryViewSet, basename='category')
+router.register(r'recurring', views.RecurringTransactionViewSet, basename='recurring-transaction')
 router.register(r'', views.TransactionViewSet, basename='transaction')
 
 urlpatterns = [
@@ -1,17 +1,28 @@
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Sum, Q
+from django.http import FileResponse, StreamingHttpResponse
 from django.utils import timezone
 from datetime import datetime
-from .models import Category, Transaction
-from .serializers import CategorySerializer, TransactionSerializer, TransactionListSerializer
-from .dashboard_serializers import DashboardSummarySerializer, MonthlyTransactionSerializer
+import tempfile
+from .models import Category, Transaction, RecurringTransaction
+from .serializers import (
+    CategorySerializer, TransactionSerializer, TransactionListSerializer, RecurringTransactionSerializer,
+    LIST_VALUES, list_representation
+)
 from accounts.permissions import IsOwner
-from .filters import TransactionFilter
-from .pagination import CustomPageNumberPagination
-from django.db.models import Count
+from accounts.cache import cached
+from accounts.conditional import conditional
+from .filters import TransactionFilter, SearchRankOrderingFilter
+from .pagination import CustomPageNumberPagination, KeysetPagination
+from .dashboard import build_dashboard
+from .analytics import build_series, parse_params
+from .recurring import reschedule
+from . import sync
+from .exports import EXPORT_FORMATS
+from .snapshots import write_snapshot, bundle
+from .imports import import_transactions, iter_csv, DEFAULT_BATCH_SIZE, MAX_BATCH_SIZE
 
 class CategoryViewSet(viewsets.ModelViewSet):
     """
@@ -21,112 +32,213 @@ class CategoryViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated, IsOwner]
     
     def get_queryset(self):
-        return Category.objects.filter(user=self.request.user).annotate(
-        total_transactions=Count('transactions')
-    )
+        # The counts and totals are kept on the category rows themselves
+        return Category.objects.filter(user=self.request.user).order_by('id')
+    
+    @conditional()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+class RecurringTransactionViewSet(viewsets.ModelViewSet):
+    """
+    CRUD operations for recurring transaction rules. Their occurrences are
+    created by the materialize_recurring management command.
+    """
+    serializer_class = RecurringTransactionSerializer
+    permission_classes = [permissions.IsAuthenticated, IsOwner]
+    
+    def get_queryset(self):
+        return RecurringTransaction.objects.filter(user=self.request.user).select_related('category').order_by('next_date', 'id')
+    
+    def perform_create(self, serializer):
+        start_date = serializer.validated_data['start_date']
+        serializer.save(user=self.request.user, next_date=start_date)
+    
+    def perform_update(self, serializer):
+        rule = serializer.instance
+        pending = rule.next_date
+        for field, value in serializer.validated_data.items():
+            setattr(rule, field, value)
+        # Continue the new schedule from where the old one stopped
+        reschedule(rule, max(pending, rule.start_date))
+        serializer.save(next_date=rule.next_date)
 
 class TransactionViewSet(viewsets.ModelViewSet):
     """
     CRUD operations for financial transactions with filtering and pagination
     """
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is handled by TransactionFilter through the full-text index
+    filter_backends = [DjangoFilterBackend, SearchRankOrderingFilter]
     pagination_class = CustomPageNumberPagination
     filterset_class = TransactionFilter
-    search_fields = ['description', 'category__name']
     ordering_fields = ['date', 'amount', 'created_at', 'category__name']
     ordering = ['-date']
     
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user)
+        return Transaction.objects.filter(user=self.request.user).select_related('category')
+    
+    @property
+    def paginator(self):
+        # ?cursor= opts into keyset pagination for infinite-scroll clients
+        if not hasattr(self, '_paginator') and KeysetPagination.cursor_query_param in self.request.query_params:
+            self._paginator = KeysetPagination()
+        return super().paginator
     
     def get_serializer_class(self):
         if self.action == 'list':
             return TransactionListSerializer
         return TransactionSerializer
     
+    # Invalid filters are rejected before the conditional check
+    @conditional(validate=lambda view, request: view.filter_queryset(view.get_queryset()))
+    def list(self, request, *args, **kwargs):
+        # Fetch plain rows instead of model instances for the list response
+        queryset = request.validated.values(*LIST_VALUES)
+        
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(list_representation(page))
+        return Response(list_representation(queryset))
+    
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
     
     @action(detail=False, methods=['get'])
+    @conditional(daily=True)
     def dashboard(self, request):
         """
         Get summary data for the dashboard
         """
-        # Get current month's data
         today = timezone.now().date()
-        current_month = today.month
-        current_year = today.year
+        dashboard_data, hit = cached(
+            request.user, 'dashboard', [today],
+            lambda: build_dashboard(request.user, today)
+        )
         
-        # Calculate total income and expenses
-        transactions = Transaction.objects.filter(user=request.user)
-        total_income = transactions.filter(transaction_type='income').aggregate(Sum('amount'))['amount__sum'] or 0
-        total_expenses = transactions.filter(transaction_type='expense').aggregate(Sum('amount'))['amount__sum'] or 0
-        net_balance = total_income - total_expenses
+        return Response(dashboard_data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+    
+    @action(detail=False, methods=['get'])
+    @conditional(daily=True, validate=lambda view, request: parse_params(request.query_params, timezone.now().date()))
+    def analytics(self, request):
+        """
+        Income/expense/net series grouped by ?granularity=day|week|month|year
+        (default month) between ?start_date= and ?end_date= (default the last
+        12 buckets), split per category with ?by_category=true
+        """
+        granularity, start_date, end_date, by_category = request.validated
+        try:
+            data, hit = cached(
+                request.user, 'analytics', [granularity, start_date, end_date, by_category],
+                lambda: build_series(request.user, start_date, end_date, granularity, by_category)
+            )
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(data, headers={'X-Cache': 'HIT' if hit else 'MISS'})
+    
+    @action(detail=False, methods=['get'], url_path='sync')
+    def delta_sync(self, request):
+        """
+        Transactions, categories and budgets created or updated, and the ids
+        of those deleted, since ?cursor= (everything without one). Pass the
+        returned cursor on the next call; page with it while has_more is
+        true, and drop all local data first when reset is true.
+        """
+        try:
+            limit = int(request.query_params.get('limit', sync.DEFAULT_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= sync.MAX_LIMIT:
+            return Response(
+                {"error": f"limit must be between 1 and {sync.MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Get expense breakdown by category
-        expense_by_category = {}
-        expense_categories = transactions.filter(transaction_type='expense').values('category__name').annotate(total=Sum('amount'))
-        for item in expense_categories:
-            if item['category__name']:
-                expense_by_category[item['category__name']] = item['total']
+        try:
+            data = sync.changes(request.user, request.query_params.get('cursor'), limit)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Get income breakdown by category
-        income_by_category = {}
-        income_categories = transactions.filter(transaction_type='income').values('category__name').annotate(total=Sum('amount'))
-        for item in income_categories:
-            if item['category__name']:
-                income_by_category[item['category__name']] = item['total']
+        return Response(data)
+    
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Import transactions from a JSON array, a text/csv body or a CSV file
+        upload (field "file") with columns amount, description, category,
+        transaction_type and date
+        """
+        try:
+            batch_size = int(request.query_params.get('batch_size', DEFAULT_BATCH_SIZE))
+        except ValueError:
+            batch_size = 0
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"batch_size must be between 1 and {MAX_BATCH_SIZE}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Get monthly summary for the last 6 months
-        monthly_summary = []
-        for i in range(5, -1, -1):
-            month = (current_month - i) % 12
-            if month == 0:
-                month = 12
-            year = current_year
-            if current_month - i <= 0:
-                year -= 1
-            
-            month_income = transactions.filter(
-                transaction_type='income',
-                date__month=month,
-                date__year=year
-            ).aggregate(Sum('amount'))['amount__sum'] or 0
-            
-            month_expenses = transactions.filter(
-                transaction_type='expense',
-                date__month=month,
-                date__year=year
-            ).aggregate(Sum('amount'))['amount__sum'] or 0
-            
-            monthly_summary.append({
-                'month': month,
-                'year': year,
-                'income': month_income,
-                'expenses': month_expenses,
-                'net': month_income - month_expenses
-            })
+        if request.content_type.startswith('text/csv'):
+            rows = iter_csv(request.stream or [])
+        elif 'file' in request.FILES:
+            rows = iter_csv(request.FILES['file'])
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            return Response(
+                {"error": "Expected a JSON array of transactions or a CSV file"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        # Get recent transactions
-        recent_transactions = TransactionListSerializer(
-            transactions.order_by('-date')[:5],
-            many=True
-        ).data
+        try:
+            created, errors = import_transactions(request.user, rows, batch_size)
+        except ValueError as error:
+            return Response({"error": str(error)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Prepare dashboard data
-        dashboard_data = {
-            'total_income': total_income,
-            'total_expenses': total_expenses,
-            'net_balance': net_balance,
-            'expense_by_category': expense_by_category,
-            'income_by_category': income_by_category,
-            'monthly_summary': monthly_summary,
-            'recent_transactions': recent_transactions,
-            'budget_status': []  # Will be populated by budget views
-        }
+        return Response({
+            'created': created,
+            'failed': len(errors),
+            'errors': errors
+        }, status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the filtered transactions as CSV (default) or NDJSON
+        (?export_format=ndjson) with constant memory use
+        """
+        export_format = request.query_params.get('export_format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"export_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        return Response(dashboard_data)
+        stream, content_type = EXPORT_FORMATS[export_format]
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(stream(queryset), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{export_format}"'
+        return response
+    
+    @action(detail=False, methods=['get'])
+    def snapshot(self, request):
+        """
+        Download the filtered transactions as a columnar .npz archive (one
+        .npy file per column with dictionary-encoded categories and types,
+        see transactions/snapshots.py) for loading straight into analytics
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        # Built on disk chunk by chunk, then streamed; closing the response
+        # deletes the file
+        archive = tempfile.TemporaryFile()
+        with tempfile.TemporaryDirectory() as directory:
+            write_snapshot(queryset, directory)
+            bundle(directory, archive)
+        archive.seek(0)
+        return FileResponse(
+            archive, as_attachment=True, filename='transactions.npz', content_type='application/octet-stream'
+        )
     
     @action(detail=False, methods=['get'])
     def filter_by_date_range(self, request):